@@ -1,7 +1,36 @@
 import random
+import numpy as np
+from util.trace import TraceKind
+
+# Nylocas spawn positions, slot order within a phase
+POSITION_NAMES = ["N1", "N2", "N3", "N4a", "N4b", "S1", "S2", "S3", "S4a", "S4b"]
+# Ticks a Nylocas walks from each position before it reaches Maiden (assumed, see Maiden)
+POSITION_DISTANCES = [8, 10, 12, 14, 14, 8, 10, 12, 14, 14]
+NYLOCAS_HP = 175  # TODO: CHECK HP
+NYLOCAS_HEAL_MULTIPLIER = 2  # A Nylocas reaching Maiden heals her for twice its remaining hp
+NYLOCAS_FREEZE_TICKS = 32  # Ice Barrage
+
+BLOOD_SPAWN_SLOTS = 10
+BLOOD_SPAWN_TICKS = 5  # TODO: Look into this
 
 class Maiden:
-    def __init__(self, scale: int):
+    """
+    The Maiden of Sugadinti fight, with the same interface as VerzikP2 for util.engine.simulate_fight.
+
+    At 70%, 50% and 30% hp she spawns Nylocas Matomenos that walk to her and heal her for twice
+    their remaining hp when they arrive, and every attack throws a blood spawn. Nylocas and blood
+    spawns live in fixed-size arrays indexed by spawn slot (phase * 10 + position for Nylocas),
+    updated in place every tick. The phase ends when she dies. Players only attack Maiden in the
+    engine, so Nylocas are only frozen or damaged through freeze_nylocas and damage_nylocas, and
+    blood trails are not modelled.
+
+    POSITION_DISTANCES are assumptions, not measured walking times: two ticks more per step away
+    from Maiden, starting at 8 for N1/S1. Every heal depends on them, so kill times of fights where
+    Nylocas reach Maiden are only as good as these numbers.
+    """
+    RESULT_COLUMNS = ['proc_70_tick', 'proc_50_tick', 'proc_30_tick']
+
+    def __init__(self, scale: int, rng=None):
         """
         Initialize Maiden with a scaling factor that adjusts the health and number of crab spawns.
         scale: int from [1,5]
@@ -9,45 +38,81 @@ class Maiden:
 
         # Adjust scaling-dependent variables
         if scale == 5:
-            self.max_health = 3500
+            self.base_hp = 3500
             self.nylocas_spawn_count = 10
         elif scale == 4:
-            self.max_health = 3062
+            self.base_hp = 3062
             self.nylocas_spawn_count = 8
-        else: 
-            self.max_health = 2625
+        else:
+            self.base_hp = 2625
             self.nylocas_spawn_count = scale*2
 
-        self.current_health = self.max_health
-        self.current_phase = 0 # Pre-70s proc
+        self.defence_lvl = 200
+        self.magic_lvl = 350
+        self.stab_def = 0
+        self.slash_def = 140
+        self.crush_def = 60
+        self.magic_def = 0
+        self.ranged_def = 0
+        self.hp = self.base_hp
+
+        self.rng = rng or random
         self.phase_thresholds = [0.7, 0.5, 0.3]
-        self.blood_spawns = []
-        self.nylocas = []
-        self.is_active = True # Fight is active
-        self.base_max = 36
-        self.attack_speed = 10
-        self.available_spawns = list(range(1, 11))  # Positions 1 to 10
-        self.position_names = {
-            1: "N1", 2: "N2", 3: "N3", 4: "N4a", 5: "N4b",
-            6: "S1", 7: "S2", 8: "S3", 9: "S4a", 10: "S4b"
-        }
-
-    def take_damage(self, damage):
+        self.current_phase = 0  # Pre-70s proc, then one more per spawn
+        self.proc_ticks = [0] * len(self.phase_thresholds)
+        self.phase_active = True
+        self.attack_cooldown_ticks = 9  # Attacks every 10 ticks
+        self.ticks_since_last_attack = 0
+        self.ticks = 0  # Ticks simulated so far
+        self.events_changed = False  # Set when a spawn moves the next event up, for util.scheduler
+        self.trace = None  # util.trace.Tracer while tracing
+
+        slots = len(self.phase_thresholds) * len(POSITION_NAMES)
+        self.nylocas_alive = np.zeros(slots, dtype=bool)
+        self.nylocas_hp = np.zeros(slots, dtype=np.int64)
+        self.nylocas_distance = np.zeros(slots, dtype=np.int64)  # Moving ticks left until reaching Maiden
+        self.nylocas_freeze = np.zeros(slots, dtype=np.int64)    # Frozen ticks left
+        self.nylocas_count = 0
+        self.blood_spawn_alive = np.zeros(BLOOD_SPAWN_SLOTS, dtype=bool)
+        self.blood_spawn_timer = np.zeros(BLOOD_SPAWN_SLOTS, dtype=np.int64)
+        self.blood_spawn_count = 0
+
+        # Scratch arrays so tick updates allocate nothing
+        self._moving = np.zeros(slots, dtype=bool)
+        self._frozen = np.zeros(slots, dtype=bool)
+        self._arrived = np.zeros(slots, dtype=bool)
+        self._steps = np.zeros(slots, dtype=np.int64)
+        self._expired = np.zeros(BLOOD_SPAWN_SLOTS, dtype=bool)
+        self._positions = list(range(len(POSITION_NAMES)))
+
+    def take_damage(self, damage: int):
         """Apply damage to Maiden -- check for reds proc."""
-        self.current_health -= damage
-        print(f"Maiden has taken {damage}. Current HP: {self.current_health}")
+        self.hp -= damage
+        self.hp = max(0, self.hp)
+        while self.current_phase < len(self.phase_thresholds) and self.hp <= self.base_hp * self.phase_thresholds[self.current_phase]:
+            if self.hp == 0:
+                # Killed through the remaining thresholds at once: they count as procced now, without spawns
+                self.proc_ticks[self.current_phase] = self.ticks
+                self.current_phase += 1
+            else:
+                self.advance_phase()
+        return self.hp <= 0
 
-        if self.current_health <= 0:
-            self.is_active = False
-            print("Maiden dead.")
-        else:
-            self.check_phase_change()
+    # Defense rolls per style
+    def slash_defense_roll(self):
+        return (self.defence_lvl + 9) * (self.slash_def + 64)
+
+    def stab_defense_roll(self):
+        return (self.defence_lvl + 9) * (self.stab_def + 64)
 
-    def check_phase_change(self):
-        """Check if red crabs should be spawning."""
-        health_percentage = self.current_health / self.max_health
-        if self.current_phase < len(self.phase_thresholds) and health_percentage <= self.phase_thresholds[self.current_phase]:
-            self.advance_phase()
+    def crush_defense_roll(self):
+        return (self.defence_lvl + 9) * (self.crush_def + 64)
+
+    def ranged_defense_roll(self):
+        return (self.defence_lvl + 9) * (self.ranged_def + 64)
+
+    def magic_defense_roll(self):
+        return (self.magic_lvl + 9) * (self.magic_def + 64)
 
     def advance_phase(self):
         """
@@ -58,81 +123,166 @@ class Maiden:
         2 : 50s spawned
         3 : 30s spawned
         """
+        self.proc_ticks[self.current_phase] = self.ticks
         self.current_phase += 1
-        self.available_positions = list(range(1, 11))
-        print(f"Maiden has entered phase {self.current_phase}")
+        if self.trace is not None:
+            self.trace.record(TraceKind.PROC, "Maiden", self.hp, f"phase {self.current_phase}")
         self.spawn_nylocas()
-        
+
     def spawn_nylocas(self):
-        """Spawn reds that move towards the boss and heal her if they reach her."""
-        spawned_positions = []
-        
+        """Spawn reds in distinct random positions. They walk towards the boss and heal her if they reach her."""
+        positions = self._positions
+        first_slot = (self.current_phase - 1) * len(POSITION_NAMES)
         for i in range(self.nylocas_spawn_count):
-            # Choose a unique position for this phase
-            position = random.choice(self.available_positions)
-            self.available_positions.remove(position)
-            position_name = self.position_names[position]
-            spawned_positions.append(position_name)
-
-            nylocas = {
-                'position': position,
-                'health': 175,  # TODO: CHECK HP
-                'moving': True  # TODO: ADD DISTANCES
-            }
-            self.nylocas.append(nylocas)
-        
-        # Summary output of all spawns for this phase
-        print(f"Nylocas have spawned at positions: {', '.join(spawned_positions)}.")
+            # Partial shuffle: positions[:i] are taken, pick one of the rest
+            j = self.rng.randint(i, len(positions) - 1)
+            positions[i], positions[j] = positions[j], positions[i]
+            slot = first_slot + positions[i]
+            self.nylocas_alive[slot] = True
+            self.nylocas_hp[slot] = NYLOCAS_HP
+            self.nylocas_distance[slot] = POSITION_DISTANCES[positions[i]]
+            self.nylocas_freeze[slot] = 0
+        self.nylocas_count += self.nylocas_spawn_count
+        self.events_changed = True
+
+        if self.trace is not None:
+            names = ", ".join(POSITION_NAMES[position] for position in positions[:self.nylocas_spawn_count])
+            self.trace.record(TraceKind.SPAWN, "Maiden", self.nylocas_spawn_count, f"nylocas at {names}")
+
+    def nylocas_target(self, unfrozen: bool = False):
+        """Slot of the Nylocas closest to reaching Maiden, only counting unfrozen ones with unfrozen. None if there is none."""
+        if not self.nylocas_count:
+            return None
+        candidates = self._moving  # Scratch, only used within a tick update otherwise
+        if unfrozen:
+            np.equal(self.nylocas_freeze, 0, out=candidates)
+            candidates &= self.nylocas_alive
+        else:
+            candidates[:] = self.nylocas_alive
+        if not candidates.any():
+            return None
+        np.add(self.nylocas_freeze, self.nylocas_distance, out=self._steps)
+        return int(np.argmin(np.where(candidates, self._steps, np.iinfo(np.int64).max)))
+
+    def freeze_nylocas(self, slot: int, ticks: int = NYLOCAS_FREEZE_TICKS):
+        """Freezes a Nylocas in place for ticks, NYLOCAS_FREEZE_TICKS for Ice Barrage."""
+        if self.nylocas_alive[slot]:
+            self.nylocas_freeze[slot] = max(self.nylocas_freeze[slot], ticks)
+            self.events_changed = True
+
+    def damage_nylocas(self, slot: int, damage: int) -> bool:
+        """Damages a Nylocas, returning whether it died."""
+        if not self.nylocas_alive[slot]:
+            return False
+        self.nylocas_hp[slot] -= damage
+        if self.nylocas_hp[slot] <= 0:
+            self.nylocas_alive[slot] = False
+            self.nylocas_count -= 1
+            self.events_changed = True
+            return True
+        return False
 
     def move_nylocas(self):
-        """Simulate Nylocas movement towards Maiden."""
-        for nylocas in self.nylocas:
-            if nylocas['moving']:
-                nylocas['position'] -= 1
-                print(f"Nylocas from {nylocas['position']} is at DISTANCE.")
+        """Moves every unfrozen Nylocas a tick closer and heals Maiden for the ones that arrive."""
+        moving, frozen, arrived = self._moving, self._frozen, self._arrived
+        np.equal(self.nylocas_freeze, 0, out=moving)
+        moving &= self.nylocas_alive
+        np.subtract(self.nylocas_distance, moving, out=self.nylocas_distance)
+        np.greater(self.nylocas_freeze, 0, out=frozen)
+        np.subtract(self.nylocas_freeze, frozen, out=self.nylocas_freeze)
 
-            if nylocas['position'] <= 0:
-                self.heal_maiden(nylocas['health']*2)
-                self.nylocas.remove(nylocas)
+        np.less_equal(self.nylocas_distance, 0, out=arrived)
+        arrived &= moving
+        if arrived.any():
+            self.heal_maiden(NYLOCAS_HEAL_MULTIPLIER * int(self.nylocas_hp[arrived].sum()))
+            self.nylocas_count -= int(arrived.sum())
+            self.nylocas_alive &= ~arrived
 
-    def heal_maiden(self, heal_amount):
+    def heal_maiden(self, heal_amount: int):
         """Heal maiden when a Nylocas reaches her (or blood splat)."""
-        self.current_health += heal_amount
-        if self.current_health > self.max_health:
-            self.current_health = self.max_health
-        print(f"Maiden is healed by {heal_amount}. Current health: {self.current_health}.")
-
-    def attack_player(self, player):
-        """Attack a player. Placeholder -- account for prayer."""
-        if player.is_praying == True:
-            damage = random.randint(0, 0.5*self.max_hit)
+        self.hp = min(self.hp + heal_amount, self.base_hp)
+        if self.trace is not None:
+            self.trace.record(TraceKind.HEAL, "Maiden", heal_amount, f"hp {self.hp}")
+
+    def spawn_blood_spawn(self):
+        """Throws a blood spawn into the first free slot."""
+        if self.blood_spawn_count == BLOOD_SPAWN_SLOTS:
+            return
+        slot = int(np.argmin(self.blood_spawn_alive))
+        self.blood_spawn_alive[slot] = True
+        self.blood_spawn_timer[slot] = BLOOD_SPAWN_TICKS
+        self.blood_spawn_count += 1
+
+    def update_blood_spawns(self, ticks: int = 1):
+        """Counts blood spawns down by ticks and removes the ones whose time is up."""
+        np.subtract(self.blood_spawn_timer, ticks, out=self.blood_spawn_timer)
+        np.less_equal(self.blood_spawn_timer, 0, out=self._expired)
+        self._expired &= self.blood_spawn_alive
+        if self._expired.any():
+            self.blood_spawn_count -= int(self._expired.sum())
+            self.blood_spawn_alive &= ~self._expired
+
+    def maiden_attack(self):
+        """Blood splat at a player, leaving a blood spawn."""
+        if self.trace is not None:
+            self.trace.record(TraceKind.BOSS_ATTACK, "Maiden", 0, "blood splat")
+        self.spawn_blood_spawn()
+
+    def is_attack_tick(self):
+        """Check if Maiden attacks at the end of the current tick."""
+        return self.ticks_since_last_attack == self.attack_cooldown_ticks
+
+    def ticks_until_next_event(self):
+        """Ticks until Maiden attacks or a Nylocas reaches her, for util.scheduler. None once she is dead."""
+        if not self.phase_active:
+            return None
+        ticks = self.attack_cooldown_ticks - self.ticks_since_last_attack
+        if self.nylocas_count:
+            # A Nylocas frozen for f more ticks with d moves left arrives f + d - 1 ticks from now
+            np.add(self.nylocas_freeze, self.nylocas_distance, out=self._steps)
+            ticks = min(ticks, int(self._steps.min(where=self.nylocas_alive, initial=ticks + 1)) - 1)
+        return ticks
+
+    def advance(self, ticks: int):
+        """Applies several idle ticks at once: only valid up to ticks_until_next_event()."""
+        self.ticks += ticks
+        self.ticks_since_last_attack += ticks
+        if self.nylocas_count:
+            steps = self._steps
+            np.subtract(ticks, self.nylocas_freeze, out=steps)
+            np.maximum(steps, 0, out=steps)
+            steps *= self.nylocas_alive
+            self.nylocas_distance -= steps
+            np.subtract(self.nylocas_freeze, ticks, out=self.nylocas_freeze)
+            np.maximum(self.nylocas_freeze, 0, out=self.nylocas_freeze)
+        if self.blood_spawn_count:
+            self.update_blood_spawns(ticks)
+
+    def simulate_tick(self, player_damage):
+        """Simulate one tick: damage from players, Nylocas walking, blood spawns and Maiden's attack."""
+        maiden_defeated = self.take_damage(player_damage)
+
+        if not maiden_defeated:
+            if self.nylocas_count:
+                self.move_nylocas()
+            if self.blood_spawn_count:
+                self.update_blood_spawns()
+
+            if self.ticks_since_last_attack == self.attack_cooldown_ticks:
+                self.maiden_attack()
+                self.ticks_since_last_attack = 0
+            else:
+                self.ticks_since_last_attack += 1
         else:
-            damage = random.randint(0, self.max_hit)
-        print(f"Maiden attacks {player} for {damage} damage.")
-        return damage
-    
-    def spawn_blood_spawn(self, player):
-        """Spawn blood near the player."""
-        blood_spawn = {
-            'target': player.current_position,
-            'time_to_disappear': 5 #TODO: Look into this
-        }
-        self.blood_spawns.append(blood_spawn)
-        print(f"Blood spawn targeting player {player}")
-
-    def update_blood_spawn(self):
-        """Update all blood spawns, check if they should explode."""
-        for spawn in self.blood_spawns:
-            spawn['time_to_explode'] -= 1
-            if spawn['time_to_explode'] <= 0:
-                print(f"Blood spawn at {spawn['target']} exploded.")
-                self.blood_spawns.remove(spawn)
-
-maiden = Maiden(scale=3)
-maiden.take_damage(310)
-maiden.take_damage(310)
-maiden.take_damage(310)
-maiden.take_damage(310)
-maiden.take_damage(310)
-maiden.take_damage(310)
+            self.phase_active = False
+            if self.trace is not None:
+                self.trace.record(TraceKind.BOSS_DEATH, "Maiden")
+        self.ticks += 1
+
+    def is_phase_active(self):
+        """Check if the fight is still going."""
+        return self.phase_active
 
+    def results(self):
+        """Tick of each proc, for RESULT_COLUMNS."""
+        return list(self.proc_ticks)
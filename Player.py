@@ -1,25 +1,104 @@
-import json
 import math
 import random
 from Prayer import Prayer, PRAYERS
 from AttackTypes import AttackStyle, AttackType
-from pathlib import Path
-from typing import Dict, Optional, Union
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Optional, Union
+from util.equipment import BONUS_COLUMNS, DEFAULT_EQUIPMENT_FILE, load_catalog
 from util.player_info import *
 from util.powered_staves_data import POWERED_STAVES_MAX_HIT
+from util.trace import TraceKind
+
+def attack_type_of_category(weapon_category: Optional[str]) -> str:
+    """Attack type of a weapon category from equipment.json."""
+    if weapon_category in ["Bow", "Crossbow"]:
+        return AttackType.RANGED
+    elif weapon_category in ["Staff", "Powered Staff"]:
+        return AttackType.MAGIC
+    else:
+        return AttackType.MELEE
 
 class PlayerStats:
+    """Skill levels. Gear bonuses are kept per player in GearBonuses, never in here."""
+    __slots__ = ('attack_level', 'strength_level', 'defense_level', 'magic_level', 'ranged_level', 'hitpoints_level')
+
     def __init__(self, attack: int, strength: int, defense: int, magic: int, ranged: int, hp: int):
         self.attack_level = attack
         self.strength_level = strength
         self.defense_level = defense
         self.magic_level = magic
         self.ranged_level = ranged
+        self.hitpoints_level = hp
+
+# (group, stat in the item's group, GearBonuses field): fields are named like the CatalogMatrix columns
+BONUS_FIELDS = [(group, stat, f"{group}_{stat}") for group, stat in BONUS_COLUMNS]
+
+class GearBonuses:
+    """
+    Summed equipment bonuses with one fixed field per bonus, e.g. offensive_stab, defensive_stab,
+    bonuses_str, so attack and defence stab/slash/crush each have their own field.
+    Player keeps one as running totals: equip_item and unequip_item apply each item's bonuses
+    as a delta, so totals, attack rolls and max hits never re-sum the equipped gear.
+    """
+    __slots__ = tuple(field for _, _, field in BONUS_FIELDS)
+
+    def __init__(self):
+        for _, _, field in BONUS_FIELDS:
+            setattr(self, field, 0)
+
+    def add(self, item: Dict, multiplier: int = 1):
+        """Adds (or with multiplier -1, removes) an item's bonuses."""
+        for group, stat, field in BONUS_FIELDS:
+            value = item.get(group, {}).get(stat)
+            if value:
+                setattr(self, field, getattr(self, field) + multiplier * value)
+
+    def copy(self) -> "GearBonuses":
+        bonuses = GearBonuses.__new__(GearBonuses)
+        for field in GearBonuses.__slots__:
+            setattr(bonuses, field, getattr(self, field))
+        return bonuses
+
+class CombatProfile:
+    """Everything the attack path needs from a player's current gear, prayer and style, derived once."""
+    __slots__ = ('attack_type', 'attack_roll', 'max_hit', 'weapon', 'weapon_speed', 'defence_style')
+
+    def __init__(self, attack_type: str, attack_roll: int, max_hit: int, weapon: Optional[str], weapon_speed: int, defence_style: str):
+        self.attack_type = attack_type
+        self.attack_roll = attack_roll
+        self.max_hit = max_hit
+        self.weapon = weapon
+        self.weapon_speed = weapon_speed
+        self.defence_style = defence_style  # Which boss defence roll the attack is checked against
+
+class Loadout(NamedTuple):
+    """An immutable, prebuilt gear setup that a player can switch to without re-equipping anything."""
+    name: str
+    gear: Mapping[str, str]
+    stats: PlayerStats
+    bonuses: GearBonuses
+    attack_style: str
+    offensive_stat: str
+    prayer: Optional[Prayer]
+    combat_profile: CombatProfile
 
 class Player:
-    def __init__(self, name: str, stats: PlayerStats, attack_style: str, offensive_stat: str, prayer_name: str = None, equipment_file: str = "./resources/equipment.json"):
+    # Fixed attribute layout: no per-instance __dict__, so thousands of live players stay small
+    __slots__ = (
+        'name', 'rng', 'equipment_file', '_combat_profile', 'stats', 'bonuses', '_attack_style', '_offensive_stat',
+        '_prayer_active', 'gear', 'hp', 'special_attack_energy', 'special_regen_ticks', 'thrall_active', 'thrall_ticks',
+        'thrall_attack_cooldown', 'vengeance_active', 'vengeance_cooldown', 'attack_cooldown', 'loadouts', 'active_loadout',
+        'trace',
+    )
+
+    def __init__(self, name: str, stats: PlayerStats, attack_style: str, offensive_stat: str, prayer_name: str = None, equipment_file: str = DEFAULT_EQUIPMENT_FILE, rng=None):
         self.name = name
+        self.rng = rng or random  # Anything with randint, e.g. util.rng.FightRandom
+        self.trace = None  # util.trace.Tracer while tracing
+        self._combat_profile = None
         self.stats = stats
+        self.bonuses = GearBonuses()
+        self.hp = stats.hitpoints_level
         self.attack_style = attack_style
         self.offensive_stat = offensive_stat
         self.prayer_active = PRAYERS.get(prayer_name)
@@ -32,60 +111,166 @@ class Player:
         self.vengeance_active = False
         self.vengeance_cooldown = 50
         self.attack_cooldown = 0
+        self.loadouts: Dict[str, Loadout] = {}
+        self.active_loadout = None
         self.load_equipment(equipment_file)
 
     def load_equipment(self, equipment_file: str):
-        """Loads equipment data from a JSON file."""
-        equipment_path = Path(equipment_file)
-        if equipment_path.is_file():
-            with open(equipment_file, 'r') as file:
-                self.equipment_data = json.load(file)
-        else:
-            raise FileNotFoundError(f"Equipment file not found at {equipment_file}.")
+        """Points the player at the shared equipment catalog for the given JSON file, loading it if needed."""
+        load_catalog(equipment_file)
+        self.equipment_file = equipment_file
+
+    @property
+    def catalog(self):
+        """The process-wide catalog of the player's equipment file, looked up rather than stored per player."""
+        return load_catalog(self.equipment_file)
+
+    @property
+    def equipment_data(self):
+        return self.catalog.items
     
     def equip_item(self, item_name: str):
         """Equips an item, modifies stats."""
-        item = next((i for i in self.equipment_data if i['name'] == item_name), None)
+        item = self.catalog.get(item_name)
         if not item:
             raise ValueError(f"Item {item_name} not found.")
         
         slot = item['slot']
         if slot in self.gear:
             self.unequip_item(slot)
+        self._detach_loadout()
         
         self.gear[slot] = item_name
         self.modify_stats(item, remove=False)
+        self._combat_profile = None
+        self.active_loadout = None
 
     def unequip_item(self, slot: str):
         """Unequips an item from specified slot."""
         if slot not in self.gear:
             raise ValueError(f"No item equipped in slot {slot}.")
         
+        self._detach_loadout()
         item_name = self.gear.pop(slot)
-        item = next((i for i in self.equipment_data if i['name'] == item_name), None)
+        item = self.catalog.get(item_name)
         self.modify_stats(item, remove=True)
+        self._combat_profile = None
+        self.active_loadout = None
+
+    def _detach_loadout(self):
+        """Gives the player its own gear and bonuses if they are still shared with a switched-to loadout."""
+        if isinstance(self.gear, MappingProxyType):
+            self.gear = dict(self.gear)
+            self.bonuses = self.bonuses.copy()
 
     def modify_stats(self, item: Dict, remove=False):
-        """Modifies player's stats based on the item's offensive, defensive, and bonuses."""
-        multiplier = -1 if remove else 1
-        
-        # Apply offensive stats
-        for stat, value in item.get('offensive', {}).items():
-            if stat not in self.stats.__dict__:
-                self.stats.__dict__[stat] = 0
-            self.stats.__dict__[stat] += multiplier * value
-        
-        # Apply defensive stats
-        for stat, value in item.get('defensive', {}).items():
-            if stat not in self.stats.__dict__:
-                self.stats.__dict__[stat] = 0
-            self.stats.__dict__[stat] += multiplier * value
-        
-        # Apply bonus stats
-        for stat, value in item.get('bonuses', {}).items():
-            if stat not in self.stats.__dict__:
-                self.stats.__dict__[stat] = 0
-            self.stats.__dict__[stat] += multiplier * value
+        """Adds or removes the item's offensive, defensive and other bonuses in the player's gear bonuses."""
+        self.bonuses.add(item, -1 if remove else 1)
+
+    @property
+    def attack_style(self) -> str:
+        return self._attack_style
+
+    @attack_style.setter
+    def attack_style(self, attack_style: str):
+        self._attack_style = attack_style
+        self._combat_profile = None
+        self.active_loadout = None
+
+    @property
+    def offensive_stat(self) -> str:
+        return self._offensive_stat
+
+    @offensive_stat.setter
+    def offensive_stat(self, offensive_stat: str):
+        self._offensive_stat = offensive_stat
+        self._combat_profile = None
+        self.active_loadout = None
+
+    @property
+    def prayer_active(self) -> Optional[Prayer]:
+        return self._prayer_active
+
+    @prayer_active.setter
+    def prayer_active(self, prayer: Optional[Prayer]):
+        self._prayer_active = prayer
+        self._combat_profile = None
+        self.active_loadout = None
+
+    def set_prayer(self, prayer_name: str):
+        """Activates a prayer by name."""
+        self.prayer_active = PRAYERS.get(prayer_name)
+
+    @property
+    def combat_profile(self) -> CombatProfile:
+        """The cached combat profile, rebuilt only after gear, prayer or style changes."""
+        if self._combat_profile is None:
+            self._combat_profile = self.build_combat_profile()
+        return self._combat_profile
+
+    def invalidate_combat_profile(self):
+        """Forces a rebuild of the combat profile, e.g. after changing stat levels directly."""
+        self._combat_profile = None
+
+    def build_combat_profile(self) -> CombatProfile:
+        """Derives the combat profile from the current gear, prayer and style."""
+        attack_type = self.get_attack_type()
+        if attack_type == AttackType.MAGIC:
+            defence_style = "magic"
+        elif attack_type == AttackType.RANGED:
+            defence_style = "ranged"
+        else:
+            defence_style = self.offensive_stat
+
+        return CombatProfile(
+            attack_type=attack_type,
+            attack_roll=self.calculate_attack_roll(),
+            max_hit=self.calculate_max_hit(),
+            weapon=self.gear.get("weapon"),
+            weapon_speed=self.get_weapon_speed(),
+            defence_style=defence_style
+        )
+
+    def snapshot_loadout(self, name: str) -> Loadout:
+        """Freezes the current gear, style and prayer into a Loadout."""
+        return Loadout(
+            name=name,
+            gear=MappingProxyType(dict(self.gear)),
+            stats=self.stats,
+            bonuses=self.bonuses.copy(),
+            attack_style=self.attack_style,
+            offensive_stat=self.offensive_stat,
+            prayer=self.prayer_active,
+            combat_profile=self.combat_profile
+        )
+
+    def add_loadout(self, loadout: Loadout):
+        """Registers a prebuilt loadout that switch_loadout can flip to."""
+        self.loadouts[loadout.name] = loadout
+
+    def switch_loadout(self, name: str):
+        """
+        Switches to a registered loadout without re-equipping any items.
+        Runtime state (attack cooldown, thrall timers, special attack energy) is kept.
+        """
+        loadout = self.loadouts.get(name)
+        if loadout is None:
+            raise ValueError(f"Loadout {name} not registered for {self.name}.")
+
+        # Gear and bonuses are shared with the loadout until an equip or unequip copies them
+        self.gear = loadout.gear
+        self.stats = loadout.stats
+        self.bonuses = loadout.bonuses
+        self._attack_style = loadout.attack_style
+        self._offensive_stat = loadout.offensive_stat
+        self._prayer_active = loadout.prayer
+        self._combat_profile = loadout.combat_profile
+        self.active_loadout = name
+
+    def equipped_items(self):
+        """Yields the catalog entry of every equipped item."""
+        for item_name in self.gear.values():
+            yield self.catalog[item_name]
 
     def get_attack_type(self) -> str:
         """Determines the attack type based on the equipped weapon."""
@@ -93,13 +278,8 @@ class Player:
         if not weapon:
             return AttackType.MELEE  # Default to melee if no weapon equipped
 
-        weapon_category = next((i['category'] for i in self.equipment_data if i['name'] == weapon), None)
-        if weapon_category in ["Bow", "Crossbow"]:
-            return AttackType.RANGED
-        elif weapon_category in ["Staff", "Powered Staff"]:
-            return AttackType.MAGIC
-        else:
-            return AttackType.MELEE
+        weapon_category = self.catalog[weapon]['category'] if weapon in self.catalog else None
+        return attack_type_of_category(weapon_category)
 
     def calculate_attack_roll(self) -> int:
         """Calculates the attack roll based on the current attack type."""
@@ -125,11 +305,10 @@ class Player:
 
     def calculate_melee_attack_roll(self) -> int:
         """Calculates the melee attack roll."""
-        equipment_bonus = sum(
-            next((i['offensive'][self.offensive_stat] for i in self.equipment_data if i['name'] == item), 0)
-            for item in self.gear.values()
-        )
-        
+        return self.melee_attack_roll(getattr(self.bonuses, f"offensive_{self.offensive_stat}"))
+
+    def melee_attack_roll(self, equipment_bonus: int) -> int:
+        """Melee attack roll for a total equipment bonus in the offensive stat."""
         effective_level = self.stats.attack_level
 
         if self.prayer_active:
@@ -142,11 +321,10 @@ class Player:
 
     def calculate_ranged_attack_roll(self) -> int:
         """Calculates the ranged attack roll."""
-        equipment_bonus = sum(
-            next((i['offensive']['ranged'] for i in self.equipment_data if i['name'] == item), 0)
-            for item in self.gear.values()
-        )
-        
+        return self.ranged_attack_roll(self.bonuses.offensive_ranged)
+
+    def ranged_attack_roll(self, equipment_bonus: int) -> int:
+        """Ranged attack roll for a total ranged equipment bonus."""
         effective_level = self.stats.ranged_level
 
         if self.prayer_active:
@@ -159,19 +337,13 @@ class Player:
 
     def calculate_magic_attack_roll(self) -> int:
         """Calculates the magic attack roll, applying special effects for Tumeken's Shadow."""
-        # Check if Tumeken's Shadow is equipped
-        tumeken_equipped = "Tumeken's shadow" in self.gear.values()
-
-        # Calculate magic equipment bonus, applying 3x for all gear except Tumeken's Shadow
-        equipment_bonus = 0
-        for item in self.gear.values():
-            item_data = next((i for i in self.equipment_data if i['name'] == item), None)
-            if item_data:
-                # If Tumeken's Shadow is equipped, multiply other gear's magic bonus by 3
-                if tumeken_equipped:
-                    equipment_bonus += 3 * item_data.get('offensive', {}).get('magic', 0)
-                else:
-                    equipment_bonus += item_data.get('offensive', {}).get('magic', 0)
+        return self.magic_attack_roll(self.bonuses.offensive_magic, self.gear.get("weapon"))
+
+    def magic_attack_roll(self, equipment_bonus: int, weapon: Optional[str]) -> int:
+        """Magic attack roll for a total magic equipment bonus, tripled when weapon is Tumeken's Shadow."""
+        # If Tumeken's Shadow is equipped, multiply the gear's magic bonus by 3
+        if weapon == "Tumeken's shadow":
+            equipment_bonus = 3 * equipment_bonus
 
         # Calculate the effective magic level
         if self.prayer_active and self.prayer_active.magic_bonus:
@@ -190,6 +362,10 @@ class Player:
         return effective_level * (equipment_bonus + 64)
     
     def calculate_melee_max_hit(self) -> int:
+        return self.melee_max_hit(self.bonuses.bonuses_str)
+
+    def melee_max_hit(self, str_bonus: int) -> int:
+        """Melee max hit for a total strength bonus."""
         str_level = self.stats.strength_level
         
         if self.prayer_active.strength_bonus:
@@ -209,18 +385,15 @@ class Player:
         #TODO add void
         effective_str_level = math.floor(effective_str_level + style_bonus + 8)
 
-        str_bonus = sum(
-            next((i['bonuses'].get('str', 0) for i in self.equipment_data if i['name'] == item), 0)
-            for item in self.gear.values()
-        )
-
         final_max_hit = (((effective_str_level * (str_bonus + 64)) + 320)/640)
         return math.floor(final_max_hit)
 
     def calculate_ranged_max_hit(self) -> int:
         """Calculates the max ranged hit for whatever idk who cares"""
-        effective_ranged_str = self.stats.ranged_level
+        return self.ranged_max_hit(self.bonuses.bonuses_ranged_str)
 
+    def ranged_max_hit(self, ranged_strength_bonus: int) -> int:
+        """Ranged max hit for a total ranged strength bonus."""
         if self.prayer_active.ranged_str_bonus:
             prayer_bonus = 1 + self.prayer_active.ranged_str_bonus
         else:
@@ -231,11 +404,6 @@ class Player:
         #TODO add void and tbow
         effective_ranged_str = (self.stats.ranged_level * prayer_bonus) + attack_style_bonus + 8
 
-        ranged_strength_bonus = sum(
-            next((i['bonuses'].get('ranged_str', 0) for i in self.equipment_data if i['name'] == item), 0)
-            for item in self.gear.values()
-        )
-
         final_max_hit = 0.5 + ((effective_ranged_str * (ranged_strength_bonus + 64))/640)
         return math.floor(final_max_hit)
 
@@ -248,18 +416,17 @@ class Player:
         if not staff_name:  # Adjust to start from level 85
             raise ValueError(f"Weapon '{staff_name}' is not a powered staff.")
 
+        # Magic strength bonus from gear (such as Ancestral gear)
+        return self.magic_max_hit(self.bonuses.bonuses_magic_str, staff_name)
+
+    def magic_max_hit(self, magic_strength_bonus: int, staff_name: str) -> int:
+        """Powered staff max hit for a total magic strength bonus (in tenths of a percent, as in equipment.json)."""
         # Fetch the player's current magic level
         magic_level = self.stats.magic_level
 
         # Get the base max hit from the lookup table, making sure the magic level is within bounds
         max_hit = POWERED_STAVES_MAX_HIT.get(min(magic_level, 125), {}).get(staff_name, 0)
 
-        # Calculate the magic strength bonus from gear (such as Ancestral gear)
-        magic_strength_bonus = sum(
-            next((i['bonuses'].get('magic_str', 0) for i in self.equipment_data if i['name'] == item), 0)
-            for item in self.gear.values()
-        )
-
         magic_strength_bonus = magic_strength_bonus / 10
   
         # If Tumeken's Shadow is equipped, triple the magic strength bonus
@@ -287,7 +454,7 @@ class Player:
         # Reset cooldown based on the weapon's speed
         weapon = self.gear.get("weapon")
         if weapon:
-            self.attack_cooldown = self.get_weapon_speed()
+            self.attack_cooldown = self.combat_profile.weapon_speed
             #print(f"{self.name} attacks with {weapon}! Cooldown set to {self.attack_cooldown} ticks.")
             return True
         else:
@@ -297,8 +464,9 @@ class Player:
 
     def thrall_attack(self):
         """Simulates the thralls attack."""
-        thrall_damage = random.randint(0, 3)
-        #print(f"{self.name}'s thrall hit for {thrall_damage} damage.")
+        thrall_damage = self.rng.randint(0, 3)
+        if self.trace is not None:
+            self.trace.record(TraceKind.THRALL, self.name, thrall_damage)
         return thrall_damage
     
     def get_weapon_speed(self):
@@ -308,7 +476,7 @@ class Player:
             return 4  # Default to 4-tick speed for bare hands
         
         # Assuming your equipment data has a 'speed' attribute for each weapon
-        return next((i['speed'] for i in self.equipment_data if i['name'] == weapon), 4)
+        return self.catalog[weapon].get('speed', 4) if weapon in self.catalog else 4
 
 
     def tick(self):
@@ -323,26 +491,47 @@ class Player:
             self.thrall_ticks += 1
         #TODO: Add thrall check here
 
+    def advance(self, ticks: int):
+        """
+        Applies several idle ticks at once, for util.scheduler. Only valid when none of them
+        would attack or regenerate special attack, i.e. ticks <= ticks_until_next_event().
+        """
+        self.attack_cooldown = max(0, self.attack_cooldown - ticks)
+        self.special_regen_ticks += ticks
+        if self.thrall_active:
+            self.thrall_ticks += ticks
+
+    def ticks_until_next_event(self) -> int:
+        """Ticks until this player can attack or regenerates special attack, whichever is first."""
+        ticks = self.attack_cooldown
+        if self.special_attack_energy < 100:
+            ticks = min(ticks, max(0, self.special_regen_interval() - 1 - self.special_regen_ticks))
+        return ticks
+
+    def special_regen_interval(self) -> int:
+        """Ticks per 10% special attack regenerated."""
+        return 50 if 'Lightbearer' in self.gear.values() else 100
+
     def regenerate_special_attack(self):
         """Regenerates special attack in increments of 10% at a time."""
-        lightbearer = 'Lightbearer' in self.gear.values()
-        regen_interval = 50 if lightbearer else 100
-
-        if self.special_regen_ticks >= regen_interval and self.special_attack_energy < 100:
+        if self.special_attack_energy < 100 and self.special_regen_ticks >= self.special_regen_interval():
             self.special_attack_energy += 10
             self.special_attack_energy = min(self.special_attack_energy, 100) # Cap at 100
             self.special_regen_ticks = 0
 
-            print(f"{self.name} regenerates special attack energy. Current: {self.special_attack_energy}%")
+            if self.trace is not None:
+                self.trace.record(TraceKind.SPEC_REGEN, self.name, self.special_attack_energy)
 
     def use_special_attack(self, energy_cost: int):
         """Use a special attack, if enough energy."""
         if self.special_attack_energy >= energy_cost:
             self.special_attack_energy -= energy_cost
-            print(f"{self.name} used a special attack.")
+            if self.trace is not None:
+                self.trace.record(TraceKind.SPEC, self.name, self.special_attack_energy)
             return True
         else:
-            print(f"{self.name} doesn't have enough energy. Current: {self.special_attack_energy}, requested: {energy_cost}")
+            if self.trace is not None:
+                self.trace.record(TraceKind.SPEC_FAILED, self.name, self.special_attack_energy, f"needs {energy_cost}")
 
     def summon_thrall(self):
         """Summons a thrall."""
@@ -361,60 +550,55 @@ class Player:
         self.hp -= damage
         if self.vengeance_active:
             reflected_damage = int(damage*0.75)
-            print(f"{self.name}'s vengeance has been activated.")
+            if self.trace is not None:
+                self.trace.record(TraceKind.VENGEANCE, self.name, reflected_damage)
             self.vengeance_active = False
         if self.hp < 0:
             self.hp = 0
-            print("he dead.")
-        print(f"{self.name} took {damage}. HP remaining {self.hp}")
+            if self.trace is not None:
+                self.trace.record(TraceKind.DEATH, self.name)
+        if self.trace is not None:
+            self.trace.record(TraceKind.DAMAGE_TAKEN, self.name, damage, f"hp {self.hp}")
     
     def heal(self, amount: int):
         """Heals by a certain amount."""
         self.hp += amount
         if self.hp > 99:
             self.hp = 99
-        print(f"{self.name} healed {amount} HP. Now {self.hp} HP.")
+        if self.trace is not None:
+            self.trace.record(TraceKind.HEAL, self.name, amount, f"hp {self.hp}")
         
     def calculate_total_bonuses(self):
-        total_bonuses = {
-            "str": 0,
-            "ranged_str": 0,
-            "magic_str": 0,
-            "prayer": 0,
+        """Strength, ranged strength, magic strength and prayer bonus of the equipped gear."""
+        bonuses = self.bonuses
+        return {
+            "str": bonuses.bonuses_str,
+            "ranged_str": bonuses.bonuses_ranged_str,
+            "magic_str": bonuses.bonuses_magic_str,
+            "prayer": bonuses.bonuses_prayer,
         }
-        for item_name in self.gear.values():
-            item = next((i for i in self.equipment_data if i['name'] == item_name), {})
-            for key in total_bonuses.keys():
-                total_bonuses[key] += item.get('bonuses', {}).get(key, 0)
-        return total_bonuses
 
     def calculate_total_offensive(self):
-        total_offensive = {
-            "stab": 0,
-            "slash": 0,
-            "crush": 0,
-            "magic": 0,
-            "ranged": 0,
+        """Attack bonuses of the equipped gear."""
+        bonuses = self.bonuses
+        return {
+            "stab": bonuses.offensive_stab,
+            "slash": bonuses.offensive_slash,
+            "crush": bonuses.offensive_crush,
+            "magic": bonuses.offensive_magic,
+            "ranged": bonuses.offensive_ranged,
         }
-        for item_name in self.gear.values():
-            item = next((i for i in self.equipment_data if i['name'] == item_name), {})
-            for key in total_offensive.keys():
-                total_offensive[key] += item.get('offensive', {}).get(key, 0)
-        return total_offensive
 
     def calculate_total_defensive(self):
-        total_defensive = {
-            "stab": 0,
-            "slash": 0,
-            "crush": 0,
-            "magic": 0,
-            "ranged": 0,
+        """Defence bonuses of the equipped gear."""
+        bonuses = self.bonuses
+        return {
+            "stab": bonuses.defensive_stab,
+            "slash": bonuses.defensive_slash,
+            "crush": bonuses.defensive_crush,
+            "magic": bonuses.defensive_magic,
+            "ranged": bonuses.defensive_ranged,
         }
-        for item_name in self.gear.values():
-            item = next((i for i in self.equipment_data if i['name'] == item_name), {})
-            for key in total_defensive.keys():
-                total_defensive[key] += item.get('defensive', {}).get(key, 0)
-        return total_defensive
 
     def __str__(self):
         return f"Player: {self.name}\n Gear: {self.gear}"
\ No newline at end of file
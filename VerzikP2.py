@@ -1,8 +1,11 @@
 import random
 import math
+from util.trace import TraceKind
 
 class VerzikP2:
-    def __init__(self, scale: int):
+    RESULT_COLUMNS = ['proc_percent']  # Extra per-fight result columns, see results()
+
+    def __init__(self, scale: int, rng=None):
 
         # Scale dependent variables
         if scale == 5:
@@ -30,6 +33,9 @@ class VerzikP2:
         self.attack_pattern = ['C', 'C', 'C', 'C', 'L']  # C = cabbage, L = lightning
         self.current_attack_index = 0  # Start at the first attack in the cycle
         self.ticks_since_last_attack = 0  # Track the ticks since Verzik's last attack
+        self.rng = rng or random  # P2's attack cycle is fixed, nothing is rolled yet
+        self.events_changed = False  # Damage never moves Verzik's next attack, see util.scheduler
+        self.trace = None  # util.trace.Tracer while tracing
 
 
     def take_damage(self, damage: int):
@@ -45,6 +51,14 @@ class VerzikP2:
         defense_roll = (self.defence_lvl + 9) * (self.slash_def + 64)
         return defense_roll
     
+    def stab_defense_roll(self):
+        defense_roll = (self.defence_lvl + 9) * (self.stab_def + 64)
+        return defense_roll
+
+    def crush_defense_roll(self):
+        defense_roll = (self.defence_lvl + 9) * (self.crush_def + 64)
+        return defense_roll
+
     def ranged_defense_roll(self):
         defense_roll = (self.defence_lvl + 9) * (self.ranged_def + 64)
         return defense_roll
@@ -53,25 +67,42 @@ class VerzikP2:
         defense_roll = (self.magic_lvl + 9) * (self.magic_def + 64)
         return defense_roll
 
+    def is_attack_tick(self):
+        """Check if Verzik attacks at the end of the current tick."""
+        return self.ticks_since_last_attack == self.attack_cooldown_ticks
+
+    def ticks_until_next_event(self):
+        """Ticks until Verzik's next attack tick, for util.scheduler. None once the phase is over."""
+        if not self.phase_active:
+            return None
+        return self.attack_cooldown_ticks - self.ticks_since_last_attack
+
+    def advance(self, ticks: int):
+        """Applies several idle ticks at once: only valid up to ticks_until_next_event()."""
+        self.ticks_since_last_attack += ticks
+
     def verzik_attack(self):
         """Verzik performs an attack based on the current tick and cycle."""
         # Check if Verzik's HP is below 35% before performing the attack
         if self.hp <= self.reds_threshold:
-            #print("Verzik's HP is below 35%. Phase 2 ends.")
             self.phase_active = False
+            if self.trace is not None:
+                self.trace.record(TraceKind.PROC, "Verzik", self.hp)
             return
 
         attack_type = self.attack_pattern[self.current_attack_index]
 
         if attack_type == 'C':
             # Cabbage attack (regular attack)
-            #print(f"Verzik throws a cabbage!")
+            if self.trace is not None:
+                self.trace.record(TraceKind.BOSS_ATTACK, "Verzik", 0, "cabbage")
             return
 
         elif attack_type == 'L':
             # Lightning attack (deals damage to Verzik)
-            #print(f"Verzik shoots a lightning attack and takes {self.lightning_damage} damage!")
             self.take_damage(self.lightning_damage)
+            if self.trace is not None:
+                self.trace.record(TraceKind.BOSS_ATTACK, "Verzik", self.lightning_damage, "lightning")
             return
 
     def simulate_tick(self, player_damage):
@@ -94,8 +125,13 @@ class VerzikP2:
                 self.ticks_since_last_attack += 1
         else:
             self.phase_active = False
-            #print("Verzik P2 has been defeated.")
+            if self.trace is not None:
+                self.trace.record(TraceKind.BOSS_DEATH, "Verzik")
 
     def is_phase_active(self):
         """Check if phase 2 is still active."""
-        return self.phase_active  # Return the phase's active status  
\ No newline at end of file
+        return self.phase_active  # Return the phase's active status 
+
+    def results(self):
+        """Values of RESULT_COLUMNS for the finished fight: hp left when reds spawned, in percent."""
+        return [(self.hp / self.base_hp) * 100] 
\ No newline at end of file
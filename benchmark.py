@@ -0,0 +1,37 @@
+import argparse
+import sys
+from util.benchmark import DEFAULT_SCENARIO_DIR, compare, default_benchmarks, format_result, load_report, run_benchmarks, save_report
+
+# Times the simulator's hot paths, e.g.
+#   python benchmark.py                                  run everything and print ns per call
+#   python benchmark.py -o bench.json                    also save the report
+#   python benchmark.py --compare bench.json             exit with 1 if anything got slower than its threshold
+#   python benchmark.py -k fight --repeat 9              only the full fight benchmarks, more rounds
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the simulator's hot paths.")
+    parser.add_argument("-k", "--filter", help="Only run benchmarks whose name contains this")
+    parser.add_argument("-o", "--output", help="Save the report as JSON to this file")
+    parser.add_argument("--compare", help="Baseline report to compare against")
+    parser.add_argument("--threshold", type=float, help="Allowed slowdown ratio for every benchmark, e.g. 0.1, instead of each one's own")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing rounds per benchmark, the fastest is reported")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per round")
+    parser.add_argument("--scenarios", default=DEFAULT_SCENARIO_DIR, help="Directory of scenarios to time full fights of")
+    args = parser.parse_args()
+
+    baseline = load_report(args.compare) if args.compare else None
+    benchmarks = [benchmark for benchmark in default_benchmarks(args.scenarios) if not args.filter or args.filter in benchmark.name]
+    report = run_benchmarks(benchmarks, args.repeat, args.min_time,
+                            progress=lambda name, result: print(format_result(name, result, baseline), flush=True))
+    if args.output:
+        save_report(report, args.output)
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression['name']}: {regression['baseline_ns']:,.0f} -> {regression['ns']:,.0f} ns "
+                  f"({regression['slowdown']:+.1%}, allowed {regression['threshold']:.0%})")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
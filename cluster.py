@@ -0,0 +1,69 @@
+import argparse
+from simulate import print_summary
+from util.cluster import Coordinator, cluster_authkey, parse_address, run_local, run_worker, start_local_workers
+from util.results import open_result_writer
+from util.scenario import Scenario
+
+# Runs one scenario across worker processes, on this host or many, e.g.
+#   python cluster.py local scenarios/6_way_mage.json -n 200000 --nodes 4 --summary
+#                                                     coordinator plus 4 local worker processes
+#   python cluster.py coordinator scenarios/6_way_mage.json -n 10000000 --bind 0.0.0.0:6000 --summary
+#   python cluster.py worker coordinator-host:6000     on every compute node, using all its cores
+# coordinator and worker need TOB_CLUSTER_AUTHKEY set to the same secret, local makes up its own.
+# Messages are pickled, and unpickling runs code: anyone who knows the secret and can reach the
+# coordinator or a worker can run code on it. Only run the cluster on a trusted network.
+def main():
+    parser = argparse.ArgumentParser(description="Sharded simulation runner with a socket coordinator.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for command in ("local", "coordinator"):
+        sub = commands.add_parser(command)
+        sub.add_argument("scenario", help="Scenario JSON file")
+        sub.add_argument("-n", "--iterations", type=int, help="Fights, overrides the scenario's iterations")
+        sub.add_argument("--shard-size", type=int, default=5000, help="Fights per shard handed to a worker")
+        sub.add_argument("--lease-timeout", type=float, help="Seconds after which an unfinished shard is also given to another worker")
+        sub.add_argument("--summary", action="store_true", help="Workers send aggregate statistics instead of every fight")
+        sub.add_argument("--output", help="Save the fights here instead of the scenario's output")
+    commands.choices["local"].add_argument("--nodes", type=int, default=2, help="Worker processes to start")
+    commands.choices["local"].add_argument("--workers", type=int, default=1, help="Pool processes per worker")
+    commands.choices["coordinator"].add_argument("--bind", default="127.0.0.1:6000", help="host:port to listen on, e.g. 0.0.0.0:6000 for other hosts")
+    commands.choices["coordinator"].add_argument("--local-workers", type=int, default=0, help="Also start this many workers on this host")
+
+    worker = commands.add_parser("worker")
+    worker.add_argument("address", help="Coordinator host:port")
+    worker.add_argument("--workers", type=int, help="Pool processes, defaults to the CPU count")
+    args = parser.parse_args()
+
+    if args.command != "local":
+        try:
+            authkey = cluster_authkey()
+        except RuntimeError as error:
+            parser.error(str(error))
+    if args.command == "worker":
+        run_worker(parse_address(args.address), authkey, args.workers)
+        return
+
+    scenario = Scenario.from_file(args.scenario)
+    if args.command == "local":
+        result = run_local(scenario, args.iterations, args.nodes, args.workers, args.shard_size, args.summary, args.lease_timeout)
+    else:
+        coordinator = Coordinator(scenario, args.iterations, args.shard_size, parse_address(args.bind), authkey,
+                                  args.summary, args.lease_timeout)
+        print(f"Coordinator listening on {coordinator.address[0]}:{coordinator.address[1]} with {len(coordinator.shards)} shards")
+        processes = start_local_workers(coordinator.address, args.local_workers) if args.local_workers else []
+        result = coordinator.run()
+        for process in processes:
+            process.wait()
+        print(f"Shards re-dispatched: {coordinator.redispatched}, workers seen: {len(coordinator.workers)}")
+
+    if args.summary:
+        print_summary(scenario.name, result.summary())
+        return
+    output = args.output or scenario.output
+    if output:
+        with open_result_writer(output, result.dtype) as writer:
+            writer.write(result)
+        print(f"Saved {len(result)} fights to {output}")
+
+if __name__ == '__main__':
+    main()
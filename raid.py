@@ -0,0 +1,31 @@
+import argparse
+from util.raid import Raid, run_raid
+from util.result_cache import DEFAULT_CACHE_DIR, ResultCache
+
+# Whole-raid time from per-room distributions, e.g.
+#   python raid.py raids/duo_maiden_verzik.json            simulate the rooms not cached yet, then combine them
+#   python raid.py raids/duo_maiden_verzik.json -n 20000   same with 20000 fights per room, only simulating the ones not cached
+def main():
+    parser = argparse.ArgumentParser(description="Combine cached per-room tick distributions into whole-raid times.")
+    parser.add_argument("raid", help="Raid JSON file")
+    parser.add_argument("-n", "--iterations", type=int, help="Fights per room, overrides each room's iterations")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_DIR, help="Directory of cached fight results, shared with simulate.py --cache")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Fights per task sent to a worker")
+    parser.add_argument("--workers", type=int, help="Worker processes, defaults to the CPU count")
+    args = parser.parse_args()
+
+    raid = Raid.from_file(args.raid)
+    result = run_raid(raid, n=args.iterations, cache=ResultCache(args.cache), max_workers=args.workers, chunk_size=args.chunk_size)
+
+    print(f"\n{raid.name}")
+    for name, distribution in result.rooms.items():
+        source = "simulated" if name in result.simulated else "cached"
+        print_distribution(f"{name} ({source})", distribution.summary())
+    print_distribution("Whole raid", result.total.summary())
+
+def print_distribution(name, summary):
+    print(f"  {name:<36} mean {summary['mean']:8.2f}  std {summary['std']:7.2f}  "
+          f"q05 {summary['q05']:5d}  median {summary['q50']:5d}  q95 {summary['q95']:5d} ticks")
+
+if __name__ == '__main__':
+    main()
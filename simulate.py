@@ -0,0 +1,113 @@
+import argparse
+from pathlib import Path
+from util.convergence import ConvergenceTarget
+from util.engine import converge_sweep, run_sweep, simulate_fight
+from util.profiling import ProfileReport
+from util.result_cache import ResultCache
+from util.scenario import BOSSES, load_scenarios
+from util.trace import TraceLevel, make_tracer
+
+# Runs scenario files from scenarios/, e.g.
+#   python simulate.py scenarios/6_way_mage.json           one scenario
+#   python simulate.py scenarios                            sweep every scenario in one warm process pool
+#   python simulate.py scenarios/8_way_mage.json --single  one fight, printing when reds spawn
+#   python simulate.py scenarios/8_way_mage.json --single --trace-level detail --trace fight.jsonl.gz
+#                                                           same, printing every event and saving them
+#   python simulate.py scenarios -n 1000000 --summary      only keep running statistics, no per-fight rows
+#   python simulate.py scenarios --precision 0.25          run until mean ticks is known to +/- 0.25 (95% CI)
+#   python simulate.py scenarios --precision 0.01 --proc-below 33   same for P(proc_percent < 33)
+#   python simulate.py scenarios -n 100000 --cache .result_cache   reuse cached fights, only simulating the ones missing
+#   python simulate.py scenarios -n 20000 --profile        print where the time and memory went
+#   python simulate.py scenarios -n 20000 --profile-out sweep.folded   same, plus collapsed stacks for a flamegraph
+def main():
+    parser = argparse.ArgumentParser(description="Run ToB fight simulations from scenario files.")
+    parser.add_argument("scenarios", nargs="+", help="Scenario JSON files or directories of them")
+    parser.add_argument("-n", "--iterations", type=int, help="Fights per scenario, overrides the scenario's iterations")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Fights per task sent to a worker")
+    parser.add_argument("--workers", type=int, help="Worker processes, defaults to the CPU count")
+    parser.add_argument("--single", action="store_true", help="Run one fight per scenario in this process")
+    parser.add_argument("--seed", type=int, help="Seed for every scenario, making runs reproducible fight by fight")
+    parser.add_argument("--trace-level", choices=[level.name.lower() for level in TraceLevel if level], help="With --single, print fight events down to this level")
+    parser.add_argument("--trace", help="With --single, also save the events to this file (.jsonl, or .jsonl.gz)")
+    parser.add_argument("--cache", help="Directory of cached fight results to reuse and extend")
+    parser.add_argument("--summary", action="store_true", help="Aggregate statistics in the workers instead of saving every fight")
+    parser.add_argument("--precision", type=float, help="Run in rounds until the confidence interval half-width is at most this")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level for --precision")
+    parser.add_argument("--proc-below", type=float, help="With --precision, estimate P(proc_percent < this) instead of mean ticks")
+    parser.add_argument("--max-iterations", type=int, default=1_000_000, help="Fight budget per scenario for --precision")
+    parser.add_argument("--round-size", type=int, default=2000, help="Fights per round for --precision")
+    parser.add_argument("--profile", action="store_true", help="Count calls and time of the hot paths, memory peaks and chunk overhead")
+    parser.add_argument("--no-profile-memory", action="store_true", help="Profile without tracemalloc, which slows fights several times over")
+    parser.add_argument("--profile-out", help="Also run cProfile and save it here: .prof for pstats, anything else for collapsed stacks")
+    args = parser.parse_args()
+
+    scenarios = load_scenarios(args.scenarios)
+    if args.seed is not None:
+        for scenario in scenarios:
+            scenario.seed = args.seed
+    if args.proc_below is not None:
+        missing = [scenario.name for scenario in scenarios if 'proc_percent' not in scenario.result_columns]
+        if missing:
+            parser.error(f"--proc-below needs a proc_percent column, which these scenarios do not record: {', '.join(missing)}")
+
+    profile = ProfileReport(cprofile=bool(args.profile_out), memory=not args.no_profile_memory) if args.profile or args.profile_out else None
+
+    if args.single:
+        level = TraceLevel[args.trace_level.upper()] if args.trace_level else (TraceLevel.ATTACK if args.trace else None)
+        for scenario in scenarios:
+            print(f"{scenario.name}:")
+            trace = make_tracer(level)
+            simulate_fight(scenario, 1, verbose=True, trace=trace, profile=profile)
+            if trace is not None:
+                if args.trace_level:
+                    print("\n".join(trace.lines()))
+                if args.trace:
+                    path = Path(args.trace)
+                    trace.export(path if len(scenarios) == 1 else path.with_name(f"{scenario.name}_{path.name}"))
+        print_profile(profile, args.profile_out)
+        return
+
+    if args.precision is not None:
+        column = 'proc_percent' if args.proc_below is not None else 'ticks_until_defeat'
+        target = ConvergenceTarget(column, args.precision, args.confidence, below=args.proc_below)
+        results = converge_sweep(scenarios, target, args.max_iterations, args.round_size,
+                                 max_workers=args.workers, chunk_size=args.chunk_size, profile=profile)
+        for name, result in results.items():
+            print(f"{name}: {result}")
+        print_profile(profile, args.profile_out)
+        return
+
+    cache = ResultCache(args.cache) if args.cache else None
+    results = run_sweep(scenarios, n=args.iterations, max_workers=args.workers, chunk_size=args.chunk_size, aggregate=args.summary,
+                        profile=profile, cache=cache)
+    if args.summary:
+        for name, aggregate in results.items():
+            print_summary(name, aggregate.summary())
+    print("Simulations done!")
+    print_profile(profile, args.profile_out)
+
+def print_profile(profile, path):
+    if profile is None:
+        return
+    print()
+    print("\n".join(profile.lines()))
+    if path:
+        profile.export(path)
+        print(f"Profile saved to {path}")
+
+def print_summary(name, summary):
+    print(f"\n{name} ({summary['count']} fights)")
+    quantiled = [column for column in ('ticks_until_defeat', 'proc_percent') if column in summary]
+    for column in quantiled:
+        stats = summary[column]
+        print(f"  {column:<20} mean {stats['mean']:8.2f}  median {stats['median']:8.2f}  "
+              f"q05 {stats['q05']:8.2f}  q95 {stats['q95']:8.2f}")
+    for column in [column for boss in BOSSES.values() for column in boss.RESULT_COLUMNS]:
+        if column in summary and column not in quantiled:
+            print(f"  {column:<20} mean {summary[column]['mean']:8.2f}  std {summary[column]['std']:8.2f}")
+    split = ", ".join(f"{column} {share:.2f}%" for column, share in summary['damage_split'].items())
+    print(f"  damage split         {split}")
+
+# Protect the multiprocessing logic with if __name__ == '__main__':
+if __name__ == '__main__':
+    main()
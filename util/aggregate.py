@@ -0,0 +1,187 @@
+import math
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+class RunningStats:
+    """Welford mean and variance, mergeable across workers (Chan et al.)."""
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: np.ndarray):
+        """Adds a batch of values."""
+        values = np.asarray(values, dtype=np.float64)
+        if not values.size:
+            return
+        batch = RunningStats()
+        batch.count = values.size
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other: "RunningStats"):
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def standard_error(self) -> float:
+        return self.std / math.sqrt(self.count) if self.count else math.inf
+
+class FixedHistogram:
+    """Counts over fixed-width bins in [low, high); values outside land in the edge bins."""
+    def __init__(self, low: float, high: float, bins: int):
+        self.low = low
+        self.high = high
+        self.counts = np.zeros(bins, dtype=np.int64)
+
+    @property
+    def edges(self) -> np.ndarray:
+        return np.linspace(self.low, self.high, len(self.counts) + 1)
+
+    def update(self, values: np.ndarray):
+        width = (self.high - self.low) / len(self.counts)
+        index = np.clip(((np.asarray(values, dtype=np.float64) - self.low) // width).astype(np.int64), 0, len(self.counts) - 1)
+        self.counts += np.bincount(index, minlength=len(self.counts))
+
+    def merge(self, other: "FixedHistogram"):
+        self.counts += other.counts
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative accuracy (DDSketch style): non-negative values go to
+    logarithmic buckets, so any quantile is within relative_accuracy of the true value and merging
+    two sketches is adding their bucket counts.
+    """
+    def __init__(self, relative_accuracy: float = 0.005):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        if np.any(values < 0):
+            raise ValueError("QuantileSketch only supports non-negative values.")
+        positive = values[values > 0]
+        self.zero_count += values.size - positive.size
+        self.count += values.size
+        keys, counts = np.unique(np.ceil(np.log(positive) / self.log_gamma).astype(np.int64), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def merge(self, other: "QuantileSketch"):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy.")
+        self.zero_count += other.zero_count
+        self.count += other.count
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+class ResultAggregate:
+    """
+    O(1)-memory summary of a run: running stats of every column, histograms and quantile sketches
+    of ticks_until_defeat and proc_percent (when the boss records it). Workers build one per chunk and the parent merges them.
+    events maps a name to (column, threshold) and tracks the probability that column < threshold,
+    e.g. {'proc_below_33': ('proc_percent', 33)}.
+    """
+    def __init__(self, columns: List[str], events: Optional[Dict[str, Tuple[str, float]]] = None):
+        self.columns = [column for column in columns if column != 'iter']
+        self.events = dict(events or {})
+        self.stats = {column: RunningStats() for column in self.columns}
+        self.event_stats = {name: RunningStats() for name in self.events}
+        histograms = {
+            'ticks_until_defeat': FixedHistogram(0, 1000, 1000),
+            'proc_percent': FixedHistogram(0, 100, 400),
+        }
+        self.histograms = {column: histogram for column, histogram in histograms.items() if column in self.columns}
+        self.sketches = {column: QuantileSketch() for column in self.histograms}
+
+    @property
+    def count(self) -> int:
+        return self.stats[self.columns[0]].count if self.columns else 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def empty_copy(self) -> "ResultAggregate":
+        """A fresh aggregate with the same columns and events."""
+        return ResultAggregate(self.columns, self.events)
+
+    def update(self, batch: np.ndarray):
+        """Adds a batch of result records."""
+        for column in self.columns:
+            self.stats[column].update(batch[column])
+        for name, (column, threshold) in self.events.items():
+            self.event_stats[name].update(batch[column] < threshold)
+        for column in self.histograms:
+            self.histograms[column].update(batch[column])
+            self.sketches[column].update(batch[column])
+
+    def merge(self, other: "ResultAggregate"):
+        for column in self.columns:
+            self.stats[column].merge(other.stats[column])
+        for name in self.events:
+            self.event_stats[name].merge(other.event_stats[name])
+        for column in self.histograms:
+            self.histograms[column].merge(other.histograms[column])
+            self.sketches[column].merge(other.sketches[column])
+
+    def quantile(self, column: str, q: float) -> float:
+        return self.sketches[column].quantile(q)
+
+    def probability(self, event: str) -> float:
+        """Observed probability of a tracked event."""
+        return self.event_stats[event].mean
+
+    def summary(self, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)) -> Dict:
+        """Mean/std of every column, quantiles of ticks and proc percent, and the damage split."""
+        summary = {'count': self.count}
+        for column in self.columns:
+            summary[column] = {'mean': self.stats[column].mean, 'std': self.stats[column].std}
+        for column in self.sketches:
+            summary[column].update({f"q{int(q * 100):02d}": self.quantile(column, q) for q in quantiles})
+            summary[column]['median'] = self.quantile(column, 0.5)
+        summary['damage_split'] = {column: self.stats[column].mean for column in self.columns if column.endswith('_dmg_percent')}
+        summary['events'] = {name: self.probability(name) for name in self.events}
+        return summary
+
+def aggregate_batch(batch: np.ndarray, template: Optional[ResultAggregate] = None) -> ResultAggregate:
+    """Builds an aggregate from one batch of records, shaped like template if given."""
+    aggregate = template.empty_copy() if template is not None else ResultAggregate(list(batch.dtype.names))
+    aggregate.update(batch)
+    return aggregate
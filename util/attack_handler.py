@@ -1,43 +1,97 @@
 import random
 import math
+from typing import List
+from util.trace import TraceKind
+
+def hit_chance(attack_roll: int, defence_roll: int) -> float:
+    """Exact probability that randint(0, attack_roll) > randint(0, defence_roll)."""
+    attack_roll = max(attack_roll, 0)
+    defence_roll = max(defence_roll, 0)
+    if attack_roll > defence_roll:
+        return 1 - (defence_roll + 2) / (2 * (attack_roll + 1))
+    return attack_roll / (2 * (defence_roll + 1))
+
+def hit_distribution(max_hit: int, accuracy: float) -> List[float]:
+    """Damage PMF of a single hit: a miss deals 0, a successful roll of 0 is clamped to 1."""
+    max_hit = max(max_hit, 0)
+    pmf = [0.0] * (max(max_hit, 1) + 1)
+    pmf[0] = 1 - accuracy
+    for damage in range(1, max_hit + 1):
+        pmf[damage] = accuracy / (max_hit + 1)
+    pmf[1] += accuracy / (max_hit + 1)  # The roll of 0 hit clamped to 1
+    return pmf
+
+def convolve(pmf_a: List[float], pmf_b: List[float]) -> List[float]:
+    """PMF of the sum of two independent damage values."""
+    result = [0.0] * (len(pmf_a) + len(pmf_b) - 1)
+    for a, p_a in enumerate(pmf_a):
+        if p_a:
+            for b, p_b in enumerate(pmf_b):
+                result[a + b] += p_a * p_b
+    return result
+
+def expected_value(pmf: List[float]) -> float:
+    """Mean of a damage PMF."""
+    return sum(damage * p for damage, p in enumerate(pmf))
+
+def attack_distribution(profile, defence_roll: int) -> List[float]:
+    """Exact damage PMF of one attack made with a combat profile against a defence roll."""
+    accuracy = hit_chance(profile.attack_roll or 0, defence_roll)
+    max_hit = profile.max_hit or 0
+
+    if profile.weapon == "Scythe of vitur":
+        # Three independent hits for max, max/2 and max/4
+        pmf = hit_distribution(max_hit, accuracy)
+        pmf = convolve(pmf, hit_distribution(math.floor(max_hit/2), accuracy))
+        return convolve(pmf, hit_distribution(math.floor(math.floor(max_hit/2)/2), accuracy))
+
+    return hit_distribution(max_hit, accuracy)
 
 class AttackHandler:
-    def __init__(self, player, boss):
+    def __init__(self, player, boss, rng=None):
         self.player = player
         self.boss = boss
+        self.rng = rng or random  # Anything with randint, e.g. util.rng.FightRandom
+        self._defense_profile = None  # Combat profile the cached defence roll belongs to
+        self._defense_roll = 0
 
     def calculate_hit_roll(self) -> int:
-        hit_roll = self.player.calculate_attack_roll()
+        hit_roll = self.player.combat_profile.attack_roll
         return hit_roll if hit_roll else 0
     
     def calculate_max_hit(self) -> int:
-        max_hit = self.player.calculate_max_hit()
+        max_hit = self.player.combat_profile.max_hit
         return max_hit if max_hit else 0
     
     def calculate_boss_defense_roll(self) -> int:
-        attack_type = self.player.get_attack_type()
-        if attack_type == "Magic":
+        profile = self.player.combat_profile
+        if profile is not self._defense_profile:
+            self._defense_roll = self.lookup_boss_defense_roll(profile.defence_style)
+            self._defense_profile = profile
+        return self._defense_roll
+
+    def lookup_boss_defense_roll(self, defence_style: str) -> int:
+        if defence_style == "magic":
             return self.boss.magic_defense_roll()
         
-        elif attack_type == "Ranged":
+        elif defence_style == "ranged":
             return self.boss.ranged_defense_roll()
         
-        elif attack_type == "Melee":
-            if self.player.offensive_stat == "slash":
-                return self.boss.slash_defense_roll()
-            elif self.player.offensive_stat == "crush":
-                return self.boss.crush_defense_roll()
-            elif self.player.offensive_stat == "stab":
-                return self.boss.stab_defense_roll()
+        elif defence_style == "slash":
+            return self.boss.slash_defense_roll()
+        elif defence_style == "crush":
+            return self.boss.crush_defense_roll()
+        elif defence_style == "stab":
+            return self.boss.stab_defense_roll()
             
         else:
-            print(f"Attack type not found. {self.player.attack_type}")
+            print(f"Defence style not found. {defence_style}")
 
     def calculate_hit(self) -> bool:
         player_attack_roll = self.calculate_hit_roll()
         boss_defense_roll = self.calculate_boss_defense_roll()
 
-        if random.randint(0, player_attack_roll) > random.randint(0, boss_defense_roll):
+        if self.rng.randint(0, player_attack_roll) > self.rng.randint(0, boss_defense_roll):
             return True
         else:
             return False
@@ -50,26 +104,27 @@ class AttackHandler:
         max_hit3 = math.floor(max_hit2/2)
 
         boss_defense_roll = self.calculate_boss_defense_roll()
+        hit_roll = self.calculate_hit_roll()
 
         # First hit:
-        if random.randint(0, self.calculate_hit_roll()) > random.randint(0, boss_defense_roll):
-            hit1 = random.randint(0, max_hit1)
+        if self.rng.randint(0, hit_roll) > self.rng.randint(0, boss_defense_roll):
+            hit1 = self.rng.randint(0, max_hit1)
             if hit1 == 0:
                 hit1 = 1 
         else:
             hit1 = 0
         
         # Second hit:
-        if random.randint(0, self.calculate_hit_roll()) > random.randint(0, boss_defense_roll):
-            hit2 = random.randint(0, max_hit2)
+        if self.rng.randint(0, hit_roll) > self.rng.randint(0, boss_defense_roll):
+            hit2 = self.rng.randint(0, max_hit2)
             if hit2 == 0:
                 hit2 = 1
         else:
             hit2 = 0
 
         # Third hit: 
-        if random.randint(0, self.calculate_hit_roll()) > random.randint(0, boss_defense_roll):
-            hit3 = random.randint(0, max_hit3)
+        if self.rng.randint(0, hit_roll) > self.rng.randint(0, boss_defense_roll):
+            hit3 = self.rng.randint(0, max_hit3)
             if hit3 == 0:
                 hit3 = 1
         else:
@@ -82,26 +137,39 @@ class AttackHandler:
 
         max_hit = self.calculate_max_hit()
 
-        if self.player.gear.get("weapon") == "Scythe of vitur":
+        if self.player.combat_profile.weapon == "Scythe of vitur":
             return self.calculate_scythe_damage(max_hit)
         
         #normal hits
         if self.calculate_hit():
-            max_hit = self.calculate_max_hit()
-            hit = random.randint(0, max_hit)
+            hit = self.rng.randint(0, max_hit)
             if hit == 0:
                 hit = 1 #hit clamping
             return hit
         else:
             return 0
         
+    def hit_chance(self) -> float:
+        """Exact chance that one accuracy roll succeeds against the boss."""
+        return hit_chance(self.calculate_hit_roll(), self.calculate_boss_defense_roll())
+
+    def damage_distribution(self) -> List[float]:
+        """Exact damage PMF of one attack, indexed by damage. Mirrors calculate_damage."""
+        return attack_distribution(self.player.combat_profile, self.calculate_boss_defense_roll())
+
+    def expected_damage(self) -> float:
+        """Mean damage of one attack."""
+        return expected_value(self.damage_distribution())
+
+    def expected_dps(self) -> float:
+        """Mean damage per tick at the current weapon speed."""
+        return self.expected_damage() / self.player.combat_profile.weapon_speed
+
     def perform_attack(self):
         if self.player.attack():
             damage = self.calculate_damage()
-            #if damage > 0:
-            #    print(f"{self.player.name} hits {self.boss.__class__.__name__} for {damage} dmg!")
-            #else:
-            #    print(f"{self.player.name} missed!")
+            if self.player.trace is not None:
+                self.player.trace.record(TraceKind.ATTACK, self.player.name, damage, self.player.combat_profile.weapon)
             return damage
 
         else:
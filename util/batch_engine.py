@@ -0,0 +1,145 @@
+import numpy as np
+from typing import Dict, List, Optional
+from Player import Loadout
+from VerzikP2 import VerzikP2
+from util.attack_handler import AttackHandler
+from util.rng import batch_generator
+
+# Pattern index of Verzik's lightning attack in VerzikP2.attack_pattern (CCCCL)
+LIGHTNING_INDEX = 4
+
+class BatchAttack:
+    """The numbers one attack needs, taken from a compiled loadout and the boss it hits."""
+    def __init__(self, loadout: Loadout, boss):
+        profile = loadout.combat_profile
+        self.attack_roll = profile.attack_roll or 0
+        self.defence_roll = AttackHandler(None, boss).lookup_boss_defense_roll(profile.defence_style)
+        self.speed = profile.weapon_speed if profile.weapon else 4
+        max_hit = profile.max_hit or 0
+
+        # Scythe hits three times for max, max/2 and max/4, each with its own accuracy roll
+        if profile.weapon == "Scythe of vitur":
+            self.max_hits = (max_hit, max_hit // 2, max_hit // 4)
+        else:
+            self.max_hits = (max_hit,)
+
+    def roll(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        """Rolls n independent attacks, same formulas as AttackHandler.calculate_damage."""
+        total = np.zeros(n, dtype=np.int64)
+        for max_hit in self.max_hits:
+            hit = rng.integers(0, self.attack_roll, n, endpoint=True) > rng.integers(0, self.defence_roll, n, endpoint=True)
+            damage = np.maximum(rng.integers(0, max_hit, n, endpoint=True), 1)  # hit clamping
+            total += np.where(hit, damage, 0)
+        return total
+
+class BatchFighter:
+    """
+    A player in a batch fight.
+    With a swap loadout, the player swaps to it for attacks that land on Verzik's attack tick,
+    otherwise the attack is delayed by a tick (like the ranger in the P2 sims).
+    """
+    def __init__(self, name: str, loadout: Loadout, boss, swap_loadout: Optional[Loadout] = None):
+        self.name = name
+        self.attack = BatchAttack(loadout, boss)
+        self.swap_attack = BatchAttack(swap_loadout, boss) if swap_loadout else None
+
+def run_p2_batch(n: int, fighters: List[BatchFighter], scale: int = 2, rng: Optional[np.random.Generator] = None, chunk_size: int = 250_000,
+                 seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Runs n independent Verzik P2 fights in lockstep, chunk_size lanes at a time.
+    Follows the tick order of run_single_simulation in the P2 sims and returns per-fight
+    'ticks_until_defeat', 'damage' (one column per fighter) and 'proc_percent' arrays.
+    With seed (and no rng), chunk i draws from util.rng.batch_generator(seed, i), so a run is
+    reproducible for a given seed and chunk_size.
+    """
+    results = {
+        'ticks_until_defeat': np.zeros(n, dtype=np.int32),
+        'damage': np.zeros((n, len(fighters)), dtype=np.int32),
+        'proc_percent': np.zeros(n, dtype=np.float64),
+    }
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        if rng is not None:
+            chunk_rng = rng
+        elif seed is not None:
+            chunk_rng = batch_generator(seed, start // chunk_size)
+        else:
+            chunk_rng = rng = np.random.default_rng()
+        _run_chunk(results, start, stop, fighters, scale, chunk_rng)
+    return results
+
+def _run_chunk(results: Dict[str, np.ndarray], start: int, stop: int, fighters: List[BatchFighter], scale: int, rng: np.random.Generator):
+    verzik = VerzikP2(scale=scale)
+    base_hp = verzik.base_hp
+    n = stop - start
+
+    # State of the lanes still fighting; finished lanes are compacted away every tick
+    lane = np.arange(start, stop)
+    hp = np.full(n, base_hp, dtype=np.int64)
+    ticks_since_attack = np.zeros(n, dtype=np.int64)
+    attack_index = np.zeros(n, dtype=np.int64)
+    cooldowns = np.zeros((len(fighters), n), dtype=np.int64)
+    damage = np.zeros((len(fighters), n), dtype=np.int64)
+
+    tick = 0
+    while lane.size:
+        verzik_attacking = ticks_since_attack == verzik.attack_cooldown_ticks
+
+        for f, fighter in enumerate(fighters):
+            ready = cooldowns[f] == 0
+            if fighter.swap_attack is None:
+                # Delay a tick rather than attack on Verzik's attack tick
+                cooldowns[f][ready & verzik_attacking] = 1
+                _attack(fighter.attack, ready & ~verzik_attacking, f, hp, cooldowns, damage, rng)
+            else:
+                _attack(fighter.swap_attack, ready & verzik_attacking, f, hp, cooldowns, damage, rng)
+                _attack(fighter.attack, ready & ~verzik_attacking, f, hp, cooldowns, damage, rng)
+
+        np.subtract(cooldowns, 1, out=cooldowns, where=cooldowns > 0)
+        tick += 1
+
+        # VerzikP2.simulate_tick: the fight ends at 0 hp, or on an attack tick at or below the reds threshold
+        dead = hp <= 0
+        attacking = ~dead & verzik_attacking
+        procced = attacking & (hp <= verzik.reds_threshold)
+        finished = dead | procced
+
+        lightning = attacking & ~procced & (attack_index == LIGHTNING_INDEX)
+        hp[lightning] = np.maximum(hp[lightning] - verzik.lightning_damage, 0)
+        advancing = attacking & ~procced
+        attack_index[advancing] = (attack_index[advancing] + 1) % len(verzik.attack_pattern)
+        ticks_since_attack[advancing] = 0
+        ticks_since_attack[~attacking] += 1
+
+        if finished.any():
+            done = lane[finished]
+            results['ticks_until_defeat'][done] = tick
+            results['damage'][done] = damage[:, finished].T
+            results['proc_percent'][done] = hp[finished] / base_hp * 100
+
+            alive = ~finished
+            lane, hp, ticks_since_attack, attack_index = lane[alive], hp[alive], ticks_since_attack[alive], attack_index[alive]
+            cooldowns, damage = cooldowns[:, alive], damage[:, alive]
+
+def _attack(attack: BatchAttack, mask: np.ndarray, f: int, hp: np.ndarray, cooldowns: np.ndarray, damage: np.ndarray, rng: np.random.Generator):
+    """Rolls an attack for the masked lanes and applies it to the boss."""
+    k = int(np.count_nonzero(mask))
+    if not k:
+        return
+    dealt = attack.roll(rng, k)
+    hp[mask] = np.maximum(hp[mask] - dealt, 0)
+    damage[f, mask] += dealt
+    cooldowns[f][mask] = attack.speed
+
+def damage_percents(damage: np.ndarray) -> np.ndarray:
+    """Converts a per-fight damage matrix into each fighter's share of the total, in percent."""
+    total = damage.sum(axis=1, keepdims=True)
+    return np.divide(damage * 100.0, total, out=np.zeros(damage.shape), where=total > 0)
+
+def to_rows(results: Dict[str, np.ndarray], first_iteration: int = 1) -> List[List]:
+    """Formats batch results like the rows run_single_simulation returns."""
+    percents = damage_percents(results['damage'])
+    return [
+        [first_iteration + i, int(ticks), *percents[i].tolist(), float(proc)]
+        for i, (ticks, proc) in enumerate(zip(results['ticks_until_defeat'], results['proc_percent']))
+    ]
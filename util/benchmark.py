@@ -0,0 +1,187 @@
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import time
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from VerzikP2 import VerzikP2
+from util.attack_handler import AttackHandler
+from util.engine import compiled_loadouts, simulate_fight
+from util.equipment import DEFAULT_EQUIPMENT_FILE, clear_catalog_cache, load_catalog
+from util.leaderboard import ranged_template
+from util.loadout import compile_loadout, create_player, default_loadouts
+from util.scenario import load_scenarios
+
+DEFAULT_SCENARIO_DIR = "scenarios"
+DEFAULT_THRESHOLD = 0.10  # Slowdown ratio over the baseline that counts as a regression
+
+class Benchmark:
+    """
+    One timed operation. setup builds all the state and returns the zero-argument function to time,
+    so only the operation itself is measured. unit names what one call does (e.g. "fight").
+    """
+    def __init__(self, name: str, setup: Callable[[], Callable[[], object]], unit: str = "call", threshold: float = DEFAULT_THRESHOLD):
+        self.name = name
+        self.setup = setup
+        self.unit = unit
+        self.threshold = threshold
+
+def weapon_loadouts() -> Dict[str, Dict]:
+    """One loadout per weapon class, for the perform_attack benchmarks."""
+    loadouts = default_loadouts()
+    saeldor = dict(loadouts["melee"], gear=["Blade of saeldor", "Avernic defender", *loadouts["melee"]["gear"][1:]])
+    bow = dict(ranged_template(), gear=["Twisted bow", "Dragon arrow", *ranged_template()["gear"]])
+    return {
+        "scythe": loadouts["melee"],
+        "melee": saeldor,
+        "powered_staff": loadouts["mage_6_way"],
+        "bow": bow,
+    }
+
+def _load_equipment_cold():
+    def run():
+        clear_catalog_cache()
+        load_catalog(DEFAULT_EQUIPMENT_FILE)
+    return run
+
+def _load_equipment_warm():
+    player = create_player("bench", default_loadouts()["melee"])
+    return lambda: player.load_equipment(DEFAULT_EQUIPMENT_FILE)
+
+def _create_player_compiled():
+    loadout = compile_loadout("melee", default_loadouts()["melee"])
+    return lambda: create_player("bench", loadout)
+
+def _create_player_raw():
+    loadout = default_loadouts()["melee"]
+    return lambda: create_player("bench", loadout)
+
+def _equip_item():
+    player = create_player("bench", default_loadouts()["melee"])
+    def run():
+        player.equip_item("Amulet of fury")
+        player.equip_item("Amulet of rancour")
+    return run
+
+def _calculate_attack_roll():
+    player = create_player("bench", default_loadouts()["melee"])
+    return player.calculate_attack_roll
+
+def _calculate_max_hit():
+    player = create_player("bench", default_loadouts()["melee"])
+    return player.calculate_max_hit
+
+def _perform_attack(weapon_class: str):
+    def setup():
+        player = create_player("bench", weapon_loadouts()[weapon_class])
+        handler = AttackHandler(player, VerzikP2(scale=2))
+        def run():
+            player.attack_cooldown = 0
+            handler.perform_attack()
+        return run
+    return setup
+
+def _simulate_tick():
+    verzik = VerzikP2(scale=2)
+    return lambda: verzik.simulate_tick(0)
+
+def _simulate_fight(scenario):
+    def setup():
+        loadouts = compiled_loadouts(scenario)
+        iterations = itertools.cycle(range(1, 51))  # The same 50 seeded fights over and over
+        return lambda: simulate_fight(scenario, next(iterations), loadouts, seed=0)
+    return setup
+
+def default_benchmarks(scenario_dir: str = DEFAULT_SCENARIO_DIR) -> List[Benchmark]:
+    benchmarks = [
+        Benchmark("load_equipment.cold", _load_equipment_cold, threshold=0.25),
+        Benchmark("load_equipment.warm", _load_equipment_warm),
+        Benchmark("create_player.compiled", _create_player_compiled),
+        Benchmark("create_player.raw", _create_player_raw),
+        Benchmark("equip_item.swap_pair", _equip_item),
+        Benchmark("calculate_attack_roll", _calculate_attack_roll),
+        Benchmark("calculate_max_hit", _calculate_max_hit),
+    ]
+    benchmarks += [Benchmark(f"perform_attack.{weapon_class}", _perform_attack(weapon_class)) for weapon_class in weapon_loadouts()]
+    benchmarks.append(Benchmark("verzik_p2.simulate_tick", _simulate_tick))
+    if Path(scenario_dir).is_dir():
+        benchmarks += [Benchmark(f"fight.{scenario.name.lower().replace(' ', '_')}", _simulate_fight(scenario), unit="fight", threshold=0.15)
+                       for scenario in load_scenarios([scenario_dir])]
+    return benchmarks
+
+def time_function(function: Callable[[], object], repeat: int = 5, min_time: float = 0.2) -> Dict:
+    """
+    Times function with timeit (garbage collection off): enough calls per round for min_time seconds,
+    repeat rounds. The fastest round is the least disturbed one, so it is the headline number.
+    """
+    timer = timeit.Timer(function)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    per_call = sorted(total / number for total in timer.repeat(repeat=repeat, number=number))
+    return {
+        'ns_per_call': per_call[0] * 1e9,
+        'median_ns_per_call': per_call[len(per_call) // 2] * 1e9,
+        'per_second': 1 / per_call[0],
+        'number': number,
+        'repeat': repeat,
+    }
+
+def run_benchmarks(benchmarks: List[Benchmark], repeat: int = 5, min_time: float = 0.2, progress: Optional[Callable[[str, Dict], None]] = None) -> Dict:
+    """Runs benchmarks and returns a JSON-ready report with the environment it ran in."""
+    load_catalog()  # Everything but the cold load benchmark measures a warm process
+    results = {}
+    for benchmark in benchmarks:
+        result = time_function(benchmark.setup(), repeat, min_time)
+        result.update(unit=benchmark.unit, threshold=benchmark.threshold)
+        results[benchmark.name] = result
+        if progress:
+            progress(benchmark.name, result)
+    return {'meta': environment(), 'results': results}
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+    }
+
+def compare(report: Dict, baseline: Dict, threshold: Optional[float] = None) -> List[Dict]:
+    """
+    Benchmarks that got slower than the baseline by more than their threshold (or threshold
+    for all of them, if given). Each entry has the name, both timings and the slowdown ratio.
+    """
+    regressions = []
+    for name, result in report['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if before is None:
+            continue
+        ratio = result['ns_per_call'] / before['ns_per_call'] - 1
+        limit = threshold if threshold is not None else result.get('threshold', DEFAULT_THRESHOLD)
+        if ratio > limit:
+            regressions.append({'name': name, 'baseline_ns': before['ns_per_call'], 'ns': result['ns_per_call'], 'slowdown': ratio, 'threshold': limit})
+    return regressions
+
+def save_report(report: Dict, path: str):
+    with open(path, 'w') as file:
+        json.dump(report, file, indent=4)
+
+def load_report(path: str) -> Dict:
+    with open(path, 'r') as file:
+        return json.load(file)
+
+def format_result(name: str, result: Dict, baseline: Optional[Dict] = None) -> str:
+    line = f"{name:<32} {result['ns_per_call']:>14,.0f} ns/{result['unit']:<5} {result['per_second']:>14,.1f} {result['unit']}s/s"
+    before = (baseline or {}).get('results', {}).get(name)
+    if before:
+        line += f"  {result['ns_per_call'] / before['ns_per_call'] - 1:+7.1%} vs baseline"
+    return line
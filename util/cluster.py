@@ -0,0 +1,226 @@
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import threading
+import time
+import numpy as np
+from collections import deque
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener, answer_challenge, deliver_challenge
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from util.engine import ScenarioSimulation, run_scenario
+from util.runner import create_executor
+from util.scenario import Scenario
+
+ROOT = Path(__file__).resolve().parent.parent
+AUTHKEY_ENV = "TOB_CLUSTER_AUTHKEY"
+
+Shard = Tuple[int, int]  # Iterations [start, stop)
+
+def cluster_authkey() -> bytes:
+    """
+    The shared secret from AUTHKEY_ENV. There is no default: messages are pickled, so anyone who
+    passes authentication can run code on the coordinator or the workers.
+    """
+    key = os.environ.get(AUTHKEY_ENV)
+    if not key:
+        raise RuntimeError(f"Set {AUTHKEY_ENV} to the same secret on the coordinator and every worker.")
+    return key.encode()
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """"host:port" -> (host, port)."""
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+class Coordinator:
+    """
+    Hands a scenario's fights out to worker processes in shards and merges what they send back.
+
+    Shards are iteration ranges of a seeded scenario (a random seed is picked if it has none), so a
+    shard replays the same fights on any worker. Protocol, pickled messages over a
+    multiprocessing.connection socket authenticated with authkey (cluster_authkey() by default).
+    Unpickling runs code, so only run it on a trusted network with a secret authkey:
+        worker -> {"type": "hello", "worker": name}     coordinator -> {"type": "job", "scenario": ..., "aggregate": ...}
+        worker -> {"type": "request"} or a result         coordinator -> {"type": "shard", "start", "stop"} or {"type": "done"}
+        worker -> {"type": "result", "start", "stop", "result": records or ResultAggregate}
+    A worker whose connection drops has its shard put back in the queue. With lease_timeout, a shard
+    out for longer than that is also handed to the next idle worker; the first result back is kept.
+    """
+    def __init__(self, scenario: Scenario, n: Optional[int] = None, shard_size: int = 5000, address: Tuple[str, int] = ("127.0.0.1", 0),
+                 authkey: Optional[bytes] = None, aggregate: bool = False, lease_timeout: Optional[float] = None):
+        self.scenario = Scenario.from_dict(scenario.to_dict())
+        if self.scenario.seed is None:
+            self.scenario.seed = secrets.randbits(63)
+        n = n or scenario.iterations
+        self.shards: List[Shard] = [(start, min(start + shard_size, n + 1)) for start in range(1, n + 1, shard_size)]
+        self.aggregate = aggregate
+        self.lease_timeout = lease_timeout
+
+        self.pending = deque(self.shards)
+        self.leases: Dict[Shard, float] = {}  # Shard -> time it was handed out
+        self.results: Dict[Shard, object] = {}
+        self.redispatched = 0
+        self.workers: List[str] = []
+        self.condition = threading.Condition()
+        self.authkey = authkey or cluster_authkey()
+        # No authkey on the listener: the challenge runs in each connection's own thread, so a client
+        # that stalls or drops during it never holds up accepting the others
+        self.listener = Listener(address)
+        self.closed = False
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.listener.address
+
+    def run(self, alive: Optional[Callable[[], bool]] = None):
+        """
+        Serves workers until every shard is back, then returns the merged records or ResultAggregate.
+        alive, if given, is polled every second and the run fails once it returns False (e.g. all local workers exited).
+        """
+        threading.Thread(target=self._accept, daemon=True).start()
+        try:
+            with self.condition:
+                while len(self.results) < len(self.shards):
+                    self.condition.wait(timeout=1.0)
+                    if alive is not None and len(self.results) < len(self.shards) and not alive():
+                        raise RuntimeError(f"Workers stopped with {len(self.shards) - len(self.results)} of {len(self.shards)} shards left.")
+        finally:
+            self.closed = True
+            self.listener.close()
+        return self.merged()
+
+    def merged(self):
+        parts = [self.results[shard] for shard in self.shards]
+        if self.aggregate:
+            total = parts[0].empty_copy()
+            for part in parts:
+                total.merge(part)
+            return total
+        if not parts:
+            return np.zeros(0, dtype=ScenarioSimulation(self.scenario).dtype)
+        records = np.concatenate(parts)
+        return records[np.argsort(records['iter'], kind='stable')]
+
+    def _accept(self):
+        while not self.closed:
+            try:
+                connection = self.listener.accept()
+            except OSError:
+                continue  # A client gone before it was accepted, or the listener closed at the end of the run
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection):
+        shard = None
+        try:
+            deliver_challenge(connection, self.authkey)
+            answer_challenge(connection, self.authkey)
+            hello = connection.recv()
+            with self.condition:
+                self.workers.append(hello["worker"])
+            connection.send({"type": "job", "scenario": self.scenario.to_dict(), "aggregate": self.aggregate})
+            while True:
+                message = connection.recv()
+                if message["type"] == "result":
+                    self._complete((message["start"], message["stop"]), message["result"])
+                    shard = None
+                shard = self._next_shard()
+                if shard is None:
+                    connection.send({"type": "done"})
+                    return
+                connection.send({"type": "shard", "start": shard[0], "stop": shard[1]})
+        except (AuthenticationError, EOFError, OSError):
+            pass  # Wrong authkey, or the worker died or went away
+        finally:
+            if shard is not None:
+                self._release(shard)
+            connection.close()
+
+    def _next_shard(self) -> Optional[Shard]:
+        """The next shard to hand out, waiting while all of them are out. None once every result is in."""
+        with self.condition:
+            while len(self.results) < len(self.shards):
+                while self.pending and self.pending[0] in self.results:
+                    self.pending.popleft()
+                if self.pending:
+                    shard = self.pending.popleft()
+                    self.leases[shard] = time.monotonic()
+                    return shard
+                if self.lease_timeout is not None:
+                    now = time.monotonic()
+                    for shard, leased in list(self.leases.items()):
+                        if now - leased > self.lease_timeout:
+                            self.leases[shard] = now
+                            self.redispatched += 1
+                            return shard
+                self.condition.wait(timeout=1.0)
+            return None
+
+    def _complete(self, shard: Shard, result):
+        with self.condition:
+            if shard not in self.results:
+                self.results[shard] = result
+            self.leases.pop(shard, None)
+            self.condition.notify_all()
+
+    def _release(self, shard: Shard):
+        """Puts the shard of a lost worker back in front of the queue."""
+        with self.condition:
+            if shard not in self.results:
+                self.leases.pop(shard, None)
+                self.pending.appendleft(shard)
+                self.redispatched += 1
+                self.condition.notify_all()
+
+def run_worker(address: Tuple[str, int], authkey: Optional[bytes] = None, max_workers: Optional[int] = None, name: Optional[str] = None):
+    """
+    Connects to a coordinator and runs shards until it says done. Each shard is spread over a
+    local process pool of max_workers (the CPU count by default), so one worker per node is enough.
+    """
+    with create_executor(max_workers) as executor:
+        # Start the pool before connecting: forked pool processes would otherwise inherit the socket
+        # and keep it open after this process dies, so the coordinator would never see it go
+        executor.submit(int).result()
+        connection = Client(address, authkey=authkey or cluster_authkey())
+        try:
+            connection.send({"type": "hello", "worker": name or f"{socket.gethostname()}:{os.getpid()}"})
+            job = connection.recv()
+            scenario = Scenario.from_dict(job["scenario"])
+            connection.send({"type": "request"})
+            while True:
+                message = connection.recv()
+                if message["type"] == "done":
+                    return
+                start, stop = message["start"], message["stop"]
+                result = run_scenario(scenario, stop - start, executor=executor, max_workers=max_workers,
+                                      aggregate=job["aggregate"], first_iteration=start)
+                connection.send({"type": "result", "start": start, "stop": stop, "result": result})
+        finally:
+            connection.close()
+
+def start_local_workers(address: Tuple[str, int], count: int, max_workers: int = 1, authkey: Optional[bytes] = None) -> List[subprocess.Popen]:
+    """
+    Starts count worker processes of cluster.py on this host, for testing a coordinator.
+    authkey is handed to them through AUTHKEY_ENV, otherwise they inherit this process's.
+    """
+    host, port = address
+    command = [sys.executable, str(ROOT / "cluster.py"), "worker", f"{host}:{port}", "--workers", str(max_workers)]
+    env = {**os.environ, AUTHKEY_ENV: authkey.decode()} if authkey is not None else None
+    return [subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) for _ in range(count)]
+
+def run_local(scenario: Scenario, n: Optional[int] = None, workers: int = 2, max_workers: int = 1, shard_size: int = 5000,
+              aggregate: bool = False, lease_timeout: Optional[float] = None):
+    """
+    Runs a scenario on a coordinator in this process and workers in separate local processes,
+    with a random authkey made for this run.
+    """
+    authkey = secrets.token_hex(32).encode()
+    coordinator = Coordinator(scenario, n, shard_size, authkey=authkey, aggregate=aggregate, lease_timeout=lease_timeout)
+    processes = start_local_workers(coordinator.address, workers, max_workers, authkey)
+    try:
+        return coordinator.run(alive=lambda: any(process.poll() is None for process in processes))
+    finally:
+        for process in processes:
+            process.wait()
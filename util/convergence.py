@@ -0,0 +1,90 @@
+import math
+from statistics import NormalDist
+from typing import Callable, Optional
+from util.aggregate import ResultAggregate
+from util.runner import RESULT_DTYPE, create_executor, run_simulations_in_parallel
+
+class ConvergenceTarget:
+    """
+    What a convergence run estimates and how precisely.
+    By default the mean of column, to within +/- precision at the given confidence.
+    With below set, the probability that column < below (e.g. proc_percent < 33) instead,
+    to within +/- precision as a probability.
+    """
+    def __init__(self, column: str = 'ticks_until_defeat', precision: float = 0.5, confidence: float = 0.95,
+                 below: Optional[float] = None):
+        self.column = column
+        self.precision = precision
+        self.confidence = confidence
+        self.below = below
+        self.z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    @property
+    def event(self) -> Optional[str]:
+        return f"{self.column}_below_{self.below}" if self.below is not None else None
+
+    def template(self, columns) -> ResultAggregate:
+        """Empty aggregate tracking everything this target needs."""
+        events = {self.event: (self.column, self.below)} if self.event else None
+        return ResultAggregate(list(columns), events)
+
+    def estimate(self, aggregate: ResultAggregate) -> float:
+        if self.event:
+            return aggregate.probability(self.event)
+        return aggregate.stats[self.column].mean
+
+    def half_width(self, aggregate: ResultAggregate) -> float:
+        """Half-width of the confidence interval: Wilson for probabilities, normal for means."""
+        n = aggregate.count
+        if n < 2:
+            return math.inf
+        if self.event:
+            p = aggregate.probability(self.event)
+            z2 = self.z ** 2
+            return self.z * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / (1 + z2 / n)
+        return self.z * aggregate.stats[self.column].standard_error
+
+class ConvergenceResult:
+    def __init__(self, aggregate: ResultAggregate, target: ConvergenceTarget, converged: bool, rounds: int):
+        self.aggregate = aggregate
+        self.target = target
+        self.converged = converged
+        self.rounds = rounds
+        self.estimate = target.estimate(aggregate)
+        self.half_width = target.half_width(aggregate)
+
+    @property
+    def iterations(self) -> int:
+        return self.aggregate.count
+
+    def __str__(self):
+        what = f"P({self.target.column} < {self.target.below})" if self.target.below is not None else f"mean {self.target.column}"
+        status = "converged" if self.converged else "budget exhausted"
+        return f"{what} = {self.estimate:.4f} +/- {self.half_width:.4f} after {self.iterations} fights ({status})"
+
+def run_until_converged(simulate: Callable, target: ConvergenceTarget, round_size: int = 2000,
+                        max_iterations: int = 1_000_000, executor=None, max_workers: Optional[int] = None,
+                        desc: str = "Simulating", **runner_options) -> ConvergenceResult:
+    """
+    Runs simulate in rounds of round_size fights, merging worker aggregates, until the confidence
+    interval of the target is within its precision or max_iterations fights have run.
+    """
+    if executor is None:
+        with create_executor(max_workers) as executor:
+            return run_until_converged(simulate, target, round_size, max_iterations, executor, max_workers, desc, **runner_options)
+
+    dtype = getattr(simulate, 'dtype', RESULT_DTYPE)
+    total = target.template(dtype.names)
+    rounds = 0
+    converged = False
+
+    while total.count < max_iterations:
+        n = min(round_size, max_iterations - total.count)
+        total.merge(run_simulations_in_parallel(simulate, n, executor=executor, max_workers=max_workers, desc=desc,
+                                                aggregate=True, template=total.empty_copy(), first_iteration=total.count + 1, **runner_options))
+        rounds += 1
+        if target.half_width(total) <= target.precision:
+            converged = True
+            break
+
+    return ConvergenceResult(total, target, converged, rounds)
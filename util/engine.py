@@ -0,0 +1,229 @@
+import numpy as np
+from typing import Dict, List, Optional
+from Player import Loadout
+from util.attack_handler import AttackHandler
+from util.aggregate import ResultAggregate, aggregate_batch
+from util.batch_engine import BatchFighter
+from util.convergence import ConvergenceTarget, run_until_converged
+from util.loadout import compile_loadouts, create_player
+from util.p2_solver import SolverFighter, solve_p2
+from util.profiling import Profiler, ProfileReport
+from util.result_cache import ResultCache, scenario_key
+from util.results import open_result_writer, result_dtype
+from util.rng import fight_random
+from util.runner import create_executor, run_simulations_in_parallel
+from util.scenario import BOSSES, Scenario
+from util.scheduler import FightScheduler
+from util.trace import TraceKind, Tracer
+
+# Compiled loadouts of this process, keyed by Scenario.loadouts_key
+_compiled_loadouts: Dict[str, Dict[str, Loadout]] = {}
+
+def compiled_loadouts(scenario: Scenario) -> Dict[str, Loadout]:
+    """Compiles a scenario's loadouts once per process and reuses them for every scenario sharing them."""
+    key = scenario.loadouts_key
+    if key not in _compiled_loadouts:
+        _compiled_loadouts[key] = compile_loadouts(scenario.loadouts)
+    return _compiled_loadouts[key]
+
+class ScenarioSimulation:
+    """Picklable simulate callable for util.runner, bound to one scenario."""
+    def __init__(self, scenario: Scenario):
+        self.scenario = scenario
+        self.dtype = result_dtype(scenario.result_columns)
+
+    def loadouts(self) -> Dict[str, Loadout]:
+        return compiled_loadouts(self.scenario)
+
+    def __call__(self, iteration: int, loadouts: Dict[str, Loadout]) -> List:
+        return simulate_fight(self.scenario, iteration, loadouts)
+
+def simulate_fight(scenario: Scenario, iteration: int, loadouts: Optional[Dict[str, Loadout]] = None, verbose: bool = False,
+                   seed: Optional[int] = None, trace: Optional[Tracer] = None, profile: Optional[ProfileReport] = None) -> List:
+    """
+    Runs one fight of a scenario and returns [iteration, ticks, damage percent per player..., proc percent, boss results...].
+    Every roll comes from the (seed, iteration) stream, seed defaulting to the scenario's, so a seeded
+    fight replays identically wherever it runs. With a util.trace.Tracer, the fight's events are recorded in it.
+    With a util.profiling.ProfileReport, the fight is profiled into it.
+    """
+    if profile is not None:
+        with Profiler(profile):
+            return simulate_fight(scenario, iteration, loadouts, verbose, seed, trace)
+    loadouts = loadouts or compiled_loadouts(scenario)
+    rng = fight_random(seed if seed is not None else scenario.seed, iteration)
+    boss = BOSSES[scenario.boss](scale=scenario.scale, rng=rng)
+
+    players = []
+    for spec in scenario.players:
+        player = create_player(spec.name, loadouts[spec.loadout], loadouts if spec.swap_loadout else None, rng=rng)
+        if spec.thrall:
+            player.summon_thrall()
+        players.append(player)
+    handlers = [AttackHandler(player, boss, rng) for player in players]
+    damage_totals = [0] * len(players)
+    nylocas_handled = [0] * len(players)  # Nylocas frozen or killed by each player in the current spawn
+    nylocas_phase = [0] * len(players)    # Boss phase nylocas_handled counts for
+    if trace is not None:
+        boss.trace = trace
+        for player in players:
+            player.trace = trace
+
+    # Only ticks where a player can act or the boss has something happening are simulated, the rest are skipped
+    scheduler = FightScheduler([*players, boss])
+    boss_index = len(players)
+    while boss.is_phase_active() and scheduler.next_tick() is not None:
+        boss_attacking = boss.is_attack_tick()
+        if trace is not None:
+            trace.tick = scheduler.tick
+
+        for i, (spec, player, handler) in enumerate(zip(scenario.players, players, handlers)):
+            if player.attack_cooldown != 0:
+                continue
+
+            if spec.on_nylocas != "ignore" and boss.nylocas_count:
+                if nylocas_phase[i] != boss.current_phase:
+                    nylocas_phase[i], nylocas_handled[i] = boss.current_phase, 0
+                slot = None
+                if spec.nylocas_per_spawn is None or nylocas_handled[i] < spec.nylocas_per_spawn:
+                    slot = boss.nylocas_target(unfrozen=spec.on_nylocas == "freeze")
+                if slot is not None:
+                    damage = handler.perform_attack()
+                    if spec.on_nylocas == "freeze":
+                        boss.freeze_nylocas(slot)
+                        nylocas_handled[i] += 1
+                    if boss.damage_nylocas(slot, damage) and spec.on_nylocas == "kill":
+                        nylocas_handled[i] += 1
+                    continue
+
+            if boss_attacking and spec.on_boss_attack == "delay":
+                player.attack_cooldown = 1  # Skip the boss's attack tick
+                if trace is not None:
+                    trace.record(TraceKind.DELAY, player.name)
+                continue
+
+            if boss_attacking and spec.on_boss_attack == "swap":
+                player.switch_loadout(spec.swap_loadout)
+                if trace is not None:
+                    trace.record(TraceKind.SWAP, player.name, 0, spec.swap_loadout)
+                damage = handler.perform_attack()
+                player.switch_loadout(spec.loadout)  # Swap straight back, keeping the attack's cooldown
+            else:
+                damage = handler.perform_attack()
+            boss.take_damage(damage)
+            damage_totals[i] += damage
+
+        for player in players:
+            player.tick()
+        boss.simulate_tick(0)
+        scheduler.end_tick()
+        if boss.events_changed:  # e.g. Maiden spawning Nylocas when a player's hit procs her
+            boss.events_changed = False
+            scheduler.schedule(boss_index)
+    tick = scheduler.tick
+
+    total_damage = sum(damage_totals)
+    damage_percents = [(damage / total_damage) * 100 if total_damage > 0 else 0 for damage in damage_totals]
+
+    if verbose:
+        if scenario.boss == "VerzikP2":
+            print(f"!!! Reds Spawned at tick {tick}!!!")
+        else:
+            print(f"!!! {scenario.boss} died at tick {tick}!!!")
+        for column, value in zip(boss.RESULT_COLUMNS, boss.results()):
+            print(f"{column}: {value}")
+
+    return [iteration, tick, *damage_percents, *boss.results()]
+
+def run_scenario(scenario: Scenario, n: Optional[int] = None, executor=None, output: Optional[str] = None,
+                 cache: Optional[ResultCache] = None, **runner_options):
+    """
+    Runs a scenario's fights in parallel and returns one record per fight.
+    With output, batches are streamed to that file (.npy, .parquet or .csv) as they arrive instead.
+    With aggregate=True, only a merged util.aggregate.ResultAggregate is returned and no rows are kept,
+    shaped like template (an empty ResultAggregate) if given.
+    With a util.result_cache.ResultCache, fights already cached for the scenario are reused and
+    only the missing iterations are simulated; output and aggregate are then built from the records.
+    """
+    simulation = ScenarioSimulation(scenario)
+    n = n or scenario.iterations
+    if cache is not None:
+        return _run_cached(simulation, n, cache, executor, output, **runner_options)
+    if output is None or runner_options.get('aggregate'):
+        return run_simulations_in_parallel(simulation, n, executor=executor, desc=scenario.name, **runner_options)
+
+    with open_result_writer(output, simulation.dtype) as writer:
+        run_simulations_in_parallel(simulation, n, executor=executor, desc=scenario.name, sink=writer.write, **runner_options)
+    return None
+
+def _run_cached(simulation: ScenarioSimulation, n: int, cache: ResultCache, executor, output: Optional[str],
+                aggregate: bool = False, template: Optional[ResultAggregate] = None, first_iteration: int = 1,
+                **runner_options):
+    scenario = simulation.scenario
+    key = scenario_key(scenario)
+    records = cache.load(key, simulation.dtype)
+    # The cache holds iterations 1..len(records), a run from a later first iteration needs those too
+    stop = first_iteration - 1 + n
+    if len(records) < stop:
+        missing = run_simulations_in_parallel(simulation, stop - len(records), executor=executor, desc=scenario.name,
+                                              first_iteration=len(records) + 1, **runner_options)
+        # Chunks arrive in completion order, the cache keeps iteration order
+        records = np.concatenate([records, missing[np.argsort(missing['iter'], kind='stable')]])
+        cache.save(key, records)
+    records = records[first_iteration - 1:stop]
+
+    if aggregate:
+        return aggregate_batch(records, template)
+    if output is not None:
+        with open_result_writer(output, simulation.dtype) as writer:
+            writer.write(records)
+        return None
+    return records
+
+def run_sweep(scenarios: List[Scenario], n: Optional[int] = None, max_workers: Optional[int] = None, save: bool = True, **runner_options) -> Dict:
+    """
+    Runs many scenarios through one warm process pool. Workers keep the catalog loaded and
+    compiled loadouts cached, so each extra scenario costs only its fights.
+    With save, scenarios that name an output stream their results there and map to None.
+    With aggregate=True, every scenario maps to its ResultAggregate and nothing is saved.
+    """
+    results = {}
+    with create_executor(max_workers) as executor:
+        for scenario in scenarios:
+            output = scenario.output if save else None
+            results[scenario.name] = run_scenario(scenario, n, executor=executor, output=output, max_workers=max_workers, **runner_options)
+    return results
+
+def converge_sweep(scenarios: List[Scenario], target: ConvergenceTarget, max_iterations: int = 1_000_000,
+                   round_size: int = 2000, max_workers: Optional[int] = None, **runner_options) -> Dict:
+    """Runs every scenario until its target is estimated precisely enough, through one warm process pool."""
+    results = {}
+    with create_executor(max_workers) as executor:
+        for scenario in scenarios:
+            results[scenario.name] = run_until_converged(ScenarioSimulation(scenario), target, round_size, max_iterations,
+                                                         executor, max_workers, desc=scenario.name, **runner_options)
+    return results
+
+def _require_p2(scenario: Scenario):
+    if scenario.boss != "VerzikP2":
+        raise ValueError(f"Scenario {scenario.name} fights {scenario.boss}, only VerzikP2 scenarios have a batch engine and solver.")
+
+def batch_fighters(scenario: Scenario):
+    """BatchFighters for util.batch_engine, from a scenario's players."""
+    _require_p2(scenario)
+    loadouts = compiled_loadouts(scenario)
+    boss = BOSSES[scenario.boss](scale=scenario.scale)
+    return [
+        BatchFighter(spec.name, loadouts[spec.loadout], boss, loadouts[spec.swap_loadout] if spec.on_boss_attack == "swap" else None)
+        for spec in scenario.players
+    ]
+
+def solve_scenario(scenario: Scenario):
+    """Exact P2 solution of a scenario via util.p2_solver."""
+    _require_p2(scenario)
+    loadouts = compiled_loadouts(scenario)
+    boss = BOSSES[scenario.boss](scale=scenario.scale)
+    fighters = [
+        SolverFighter(spec.name, loadouts[spec.loadout], boss, loadouts[spec.swap_loadout] if spec.on_boss_attack == "swap" else None)
+        for spec in scenario.players
+    ]
+    return solve_p2(fighters, scale=scenario.scale)
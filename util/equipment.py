@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import pickle
+import numpy as np
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_EQUIPMENT_FILE = "./resources/equipment.json"
+COMPILED_SUFFIX = ".catalog.pickle"
+COMPILED_FORMAT_VERSION = 1
+
+# Slots of a loadout vector in CatalogMatrix, in order
+EQUIPMENT_SLOTS = ['weapon', 'head', 'body', 'legs', 'shield', 'cape', 'neck', 'hands', 'feet', 'ring', 'ammo']
+
+# (group, stat) of every CatalogMatrix column, named f"{group}_{stat}"
+BONUS_COLUMNS = [
+    ('offensive', 'stab'), ('offensive', 'slash'), ('offensive', 'crush'), ('offensive', 'magic'), ('offensive', 'ranged'),
+    ('defensive', 'stab'), ('defensive', 'slash'), ('defensive', 'crush'), ('defensive', 'magic'), ('defensive', 'ranged'),
+    ('bonuses', 'str'), ('bonuses', 'ranged_str'), ('bonuses', 'magic_str'), ('bonuses', 'prayer'),
+]
+
+class CatalogMatrix:
+    """
+    Dense view of a catalog: bonuses is an items x BONUS_COLUMNS int32 matrix, with one extra
+    all-zero row (empty_row) standing for an empty slot. A loadout is a vector of one row index
+    per EQUIPMENT_SLOTS entry, so the totals of any number of loadouts are one gather and a sum.
+    """
+    def __init__(self, items: List[Dict]):
+        self.columns = [f"{group}_{stat}" for group, stat in BONUS_COLUMNS]
+        self.column_index = {column: index for index, column in enumerate(self.columns)}
+        self.empty_row = len(items)
+        self.names = [item['name'] for item in items] + [None]
+        self.categories = [item.get('category') for item in items] + [None]
+
+        self.bonuses = np.zeros((len(items) + 1, len(BONUS_COLUMNS)), dtype=np.int32)
+        self.speed = np.full(len(items) + 1, 4, dtype=np.int32)  # Bare hands attack every 4 ticks
+        self.two_handed = np.zeros(len(items) + 1, dtype=bool)
+        self.slot = np.full(len(items) + 1, -1, dtype=np.int8)
+        self.row_of_name: Dict[str, int] = {}
+
+        slot_codes = {slot: code for code, slot in enumerate(EQUIPMENT_SLOTS)}
+        for row, item in enumerate(items):
+            for column, (group, stat) in enumerate(BONUS_COLUMNS):
+                self.bonuses[row, column] = item.get(group, {}).get(stat) or 0
+            self.speed[row] = item.get('speed') or 4
+            self.two_handed[row] = bool(item.get('isTwoHanded'))
+            self.slot[row] = slot_codes.get(item['slot'].lower(), -1)
+            self.row_of_name.setdefault(item['name'], row)  # First entry wins, like EquipmentCatalog.by_name
+
+        self.slot_rows = {slot: np.flatnonzero(self.slot == code) for slot, code in slot_codes.items()}
+
+    def column(self, name: str) -> int:
+        return self.column_index[name]
+
+    def loadout_rows(self, gear: Iterable[str]) -> np.ndarray:
+        """Row vector of a list of item names, empty_row for every slot left empty."""
+        rows = np.full(len(EQUIPMENT_SLOTS), self.empty_row, dtype=np.int64)
+        for name in gear:
+            row = self.row_of_name.get(name)
+            if row is None:
+                raise ValueError(f"Item {name} not found.")
+            rows[self.slot[row]] = row
+        return rows
+
+    def totals(self, rows: np.ndarray) -> np.ndarray:
+        """Bonus totals of loadouts: rows of shape (..., len(EQUIPMENT_SLOTS)) give (..., len(BONUS_COLUMNS))."""
+        return self.bonuses[rows].sum(axis=-2)
+
+class EquipmentCatalog:
+    """Indexed view of equipment.json with O(1) lookups by name, id and slot."""
+    def __init__(self, items: List[Dict], source_hash: Optional[str] = None):
+        self.items = items
+        self.source_hash = source_hash  # sha256 of the JSON the items were parsed from
+        self.by_name: Dict[str, Dict] = {}
+        self.by_id: Dict[int, Dict] = {}
+        self.by_slot: Dict[str, List[Dict]] = {}
+
+        for item in items:
+            # Several items share a name (charged/uncharged versions etc.), the first entry wins
+            # so lookups resolve to the same item the old linear scans did.
+            self.by_name.setdefault(item['name'], item)
+            self.by_id.setdefault(item['id'], item)
+            self.by_slot.setdefault(item['slot'], []).append(item)
+
+    @classmethod
+    def from_json(cls, equipment_file: str = DEFAULT_EQUIPMENT_FILE) -> "EquipmentCatalog":
+        """Parses an equipment JSON file into a catalog."""
+        equipment_path = Path(equipment_file)
+        if not equipment_path.is_file():
+            raise FileNotFoundError(f"Equipment file not found at {equipment_file}.")
+
+        raw = equipment_path.read_bytes()
+        return cls(json.loads(raw), source_hash=hashlib.sha256(raw).hexdigest())
+
+    def get(self, name: str, default: Optional[Dict] = None) -> Optional[Dict]:
+        """Returns the item with the given name, or default if it does not exist."""
+        return self.by_name.get(name, default)
+
+    def get_by_id(self, item_id: int, default: Optional[Dict] = None) -> Optional[Dict]:
+        """Returns the item with the given id, or default if it does not exist."""
+        return self.by_id.get(item_id, default)
+
+    def items_in_slot(self, slot: str) -> List[Dict]:
+        """Returns every item that goes in the given slot."""
+        return self.by_slot.get(slot, [])
+
+    def __getitem__(self, name: str) -> Dict:
+        return self.by_name[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.by_name
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def matrix(self) -> CatalogMatrix:
+        """The catalog as a CatalogMatrix, built on first use."""
+        if getattr(self, '_matrix', None) is None:
+            self._matrix = CatalogMatrix(self.items)
+        return self._matrix
+
+
+def file_hash(equipment_file: str) -> str:
+    """Returns the sha256 hex digest of an equipment file."""
+    return hashlib.sha256(Path(equipment_file).read_bytes()).hexdigest()
+
+def compiled_path(equipment_file: str) -> Path:
+    """Returns where the compiled form of equipment_file is stored."""
+    path = Path(equipment_file)
+    return path.with_name(path.name + COMPILED_SUFFIX)
+
+def compile_catalog(equipment_file: str = DEFAULT_EQUIPMENT_FILE, catalog: Optional[EquipmentCatalog] = None) -> Path:
+    """Writes a pickled catalog next to equipment_file, stamped with the source file's hash."""
+    if catalog is None:
+        catalog = EquipmentCatalog.from_json(equipment_file)
+    target = compiled_path(equipment_file)
+    payload = {
+        'format_version': COMPILED_FORMAT_VERSION,
+        'source_hash': catalog.source_hash or file_hash(equipment_file),
+        'items': catalog.items,
+    }
+
+    # Write to a temporary file first so concurrent workers never read a half-written cache
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as file:
+        pickle.dump(payload, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, target)
+    return target
+
+def load_compiled_catalog(equipment_file: str = DEFAULT_EQUIPMENT_FILE) -> Optional[EquipmentCatalog]:
+    """Loads the compiled catalog for equipment_file, or None if it is missing or stale."""
+    target = compiled_path(equipment_file)
+    if not target.is_file():
+        return None
+
+    try:
+        with open(target, 'rb') as file:
+            payload = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+
+    source_hash = file_hash(equipment_file)
+    if payload.get('format_version') != COMPILED_FORMAT_VERSION or payload.get('source_hash') != source_hash:
+        return None
+    return EquipmentCatalog(payload['items'], source_hash=source_hash)
+
+
+# Catalogs shared by every player in the process, keyed by resolved file path and by the path as given
+_CATALOGS: Dict[str, EquipmentCatalog] = {}
+
+def load_catalog(equipment_file: str = DEFAULT_EQUIPMENT_FILE, use_compiled: bool = True) -> EquipmentCatalog:
+    """
+    Returns the process-wide catalog for equipment_file, loading it on first use.
+    With use_compiled, a compiled cache is read when its hash matches the JSON, and (re)written otherwise.
+    """
+    # Players look their catalog up by the path they were given, so try that before resolving it
+    catalog = _CATALOGS.get(equipment_file)
+    if catalog is not None:
+        return catalog
+
+    key = str(Path(equipment_file).resolve())
+    catalog = _CATALOGS.get(key)
+    if catalog is not None:
+        _CATALOGS[equipment_file] = catalog
+        return catalog
+
+    if not Path(equipment_file).is_file():
+        raise FileNotFoundError(f"Equipment file not found at {equipment_file}.")
+
+    if use_compiled:
+        catalog = load_compiled_catalog(equipment_file)
+    if catalog is None:
+        catalog = EquipmentCatalog.from_json(equipment_file)
+        if use_compiled:
+            try:
+                compile_catalog(equipment_file, catalog)
+            except OSError:
+                pass  # Read-only checkout, fall back to parsing the JSON each process
+
+    _CATALOGS[key] = catalog
+    _CATALOGS[equipment_file] = catalog
+    return catalog
+
+def clear_catalog_cache():
+    """Drops the process-wide catalogs so the next load_catalog re-reads the files."""
+    _CATALOGS.clear()
@@ -0,0 +1,167 @@
+import numpy as np
+from typing import Callable, Dict, Optional
+from AttackTypes import AttackStyle, AttackType
+from Player import Player, PlayerStats, attack_type_of_category
+from VerzikP2 import VerzikP2
+from util.attack_handler import AttackHandler
+from util.equipment import EQUIPMENT_SLOTS, CatalogMatrix, load_catalog
+from util.loadout import default_loadouts
+from util.optimizer import AMMOLESS_BOWS
+
+ATTACK_TYPE_CODES = [AttackType.MELEE, AttackType.RANGED, AttackType.MAGIC]
+MELEE_STATS = ['stab', 'slash', 'crush']
+
+WEAPON_SLOT = EQUIPMENT_SLOTS.index('weapon')
+SHIELD_SLOT = EQUIPMENT_SLOTS.index('shield')
+AMMO_SLOT = EQUIPMENT_SLOTS.index('ammo')
+
+LEADERBOARD_DTYPE = np.dtype([
+    ('weapon', 'U64'), ('attack_type', 'U8'), ('offensive_stat', 'U8'),
+    ('attack_roll', np.int64), ('max_hit', np.int64), ('speed', np.int32), ('dps', np.float64),
+])
+
+def ranged_template():
+    """Gear the ranged weapons of the leaderboard are scored in. Ammo is picked per weapon."""
+    return {
+        "stats": PlayerStats(attack=118, strength=118, defense=118, magic=112, ranged=112, hp=121),
+        "prayer": "Rigour",
+        "attack_style": AttackStyle.RAPID,
+        "offensive_stat": "ranged",
+        "gear": [
+            "Masori mask (f)",
+            "Masori body (f)",
+            "Masori chaps (f)",
+            "Necklace of anguish",
+            "Zaryte vambraces",
+            "Pegasian boots",
+            "Venator ring",
+            "Dizana's quiver",
+        ]
+    }
+
+def default_templates() -> Dict[str, Dict]:
+    """The rest-of-gear every weapon of an attack type is scored in."""
+    loadouts = default_loadouts()
+    return {
+        AttackType.MELEE: loadouts["melee"],
+        AttackType.RANGED: ranged_template(),
+        AttackType.MAGIC: loadouts["mage_6_way"],
+    }
+
+def by_distinct_value(function: Callable[[int], int], values: np.ndarray) -> np.ndarray:
+    """Applies a scalar Player formula to an array, evaluating it once per distinct value."""
+    distinct, inverse = np.unique(values, return_inverse=True)
+    return np.array([function(int(value)) for value in distinct], dtype=np.int64)[inverse].reshape(np.shape(values))
+
+def hit_chances(attack_rolls: np.ndarray, defence_roll: int) -> np.ndarray:
+    """Array form of attack_handler.hit_chance."""
+    attack_rolls = np.maximum(attack_rolls, 0).astype(np.float64)
+    defence_roll = max(defence_roll, 0)
+    return np.where(attack_rolls > defence_roll,
+                    1 - (defence_roll + 2) / (2 * (attack_rolls + 1)),
+                    attack_rolls / (2 * (defence_roll + 1)))
+
+def expected_hit(max_hits: np.ndarray, accuracy: np.ndarray) -> np.ndarray:
+    """Mean of attack_handler.hit_distribution: uniform 0..max with the 0 clamped to 1."""
+    max_hits = np.maximum(max_hits, 0)
+    return accuracy * (max_hits / 2 + 1 / (max_hits + 1))
+
+def score_loadouts(player: Player, rows: np.ndarray, boss, matrix: Optional[CatalogMatrix] = None) -> Dict[str, np.ndarray]:
+    """
+    Scores many loadouts at once for player's stats, prayer, style and offensive stat.
+    rows has one CatalogMatrix row vector per loadout; returns 'totals', 'attack_type' (index
+    into ATTACK_TYPE_CODES), 'attack_roll', 'max_hit', 'speed' and 'dps' (expected damage per tick).
+    Rolls and max hits come from the Player formulas, evaluated once per distinct bonus total.
+    """
+    matrix = matrix or player.catalog.matrix
+    rows = np.atleast_2d(rows)
+    weapons = rows[:, WEAPON_SLOT]
+    totals = matrix.totals(rows)
+    attack_type = by_distinct_value(lambda row: ATTACK_TYPE_CODES.index(attack_type_of_category(matrix.categories[row])), weapons)
+
+    attack_roll = np.zeros(len(rows), dtype=np.int64)
+    max_hit = np.zeros(len(rows), dtype=np.int64)
+    dps = np.zeros(len(rows), dtype=np.float64)
+    speed = matrix.speed[weapons]
+    handler = AttackHandler(None, boss)
+
+    melee = attack_type == ATTACK_TYPE_CODES.index(AttackType.MELEE)
+    attack_roll[melee] = by_distinct_value(player.melee_attack_roll, totals[melee, matrix.column(f"offensive_{player.offensive_stat}")])
+    max_hit[melee] = by_distinct_value(player.melee_max_hit, totals[melee, matrix.column("bonuses_str")])
+
+    ranged = attack_type == ATTACK_TYPE_CODES.index(AttackType.RANGED)
+    attack_roll[ranged] = by_distinct_value(player.ranged_attack_roll, totals[ranged, matrix.column("offensive_ranged")])
+    max_hit[ranged] = by_distinct_value(player.ranged_max_hit, totals[ranged, matrix.column("bonuses_ranged_str")])
+
+    magic = attack_type == ATTACK_TYPE_CODES.index(AttackType.MAGIC)
+    for weapon in np.unique(weapons[magic]):
+        # Staff-specific formulas (max hit table, Tumeken's shadow), one staff at a time
+        name = matrix.names[weapon]
+        mask = magic & (weapons == weapon)
+        attack_roll[mask] = by_distinct_value(lambda bonus: player.magic_attack_roll(bonus, name), totals[mask, matrix.column("offensive_magic")])
+        max_hit[mask] = by_distinct_value(lambda bonus: player.magic_max_hit(bonus, name) if name else 0, totals[mask, matrix.column("bonuses_magic_str")])
+
+    for code, defence_style in ((0, player.offensive_stat), (1, "ranged"), (2, "magic")):
+        mask = attack_type == code
+        if not mask.any():
+            continue
+        accuracy = hit_chances(attack_roll[mask], handler.lookup_boss_defense_roll(defence_style))
+        hits = max_hit[mask]
+        expected = expected_hit(hits, accuracy)
+        # Scythe of vitur hits three times for max, max/2 and max/4, each rolled separately
+        scythe = np.array([matrix.names[weapon] == "Scythe of vitur" for weapon in weapons[mask]], dtype=bool)
+        expected[scythe] += expected_hit(hits[scythe] // 2, accuracy[scythe]) + expected_hit(hits[scythe] // 2 // 2, accuracy[scythe])
+        dps[mask] = expected / speed[mask]
+
+    return {'totals': totals, 'attack_type': attack_type, 'attack_roll': attack_roll, 'max_hit': max_hit, 'speed': speed, 'dps': dps}
+
+def weapon_leaderboard(boss=None, templates: Optional[Dict[str, Dict]] = None) -> np.ndarray:
+    """
+    Expected damage per tick of every weapon in the catalog against boss (Verzik P2 by default),
+    each scored in its attack type's template gear from templates (default_templates() by default).
+    Two-handed weapons drop the template's shield, ranged weapons get matching ammo, and melee
+    weapons are scored on stab, slash and crush with the best kept. Sorted best first.
+    """
+    boss = boss or VerzikP2(scale=2)
+    templates = templates or default_templates()
+    matrix = load_catalog().matrix
+    weapons = np.array([row for row in matrix.slot_rows['weapon'] if matrix.row_of_name[matrix.names[row]] == row])
+    weapon_types = np.array([attack_type_of_category(matrix.categories[row]) for row in weapons])
+
+    entries = []
+    for attack_type, template in templates.items():
+        type_weapons = weapons[weapon_types == attack_type]
+        if not len(type_weapons):
+            continue
+        rows = np.tile(matrix.loadout_rows(template["gear"]), (len(type_weapons), 1))
+        rows[:, WEAPON_SLOT] = type_weapons
+        rows[matrix.two_handed[type_weapons], SHIELD_SLOT] = matrix.empty_row
+        if attack_type == AttackType.RANGED:
+            rows[:, AMMO_SLOT] = [_ranged_ammo(matrix, weapon) for weapon in type_weapons]
+
+        offensive_stats = MELEE_STATS if attack_type == AttackType.MELEE else [template["offensive_stat"]]
+        best = None
+        for offensive_stat in offensive_stats:
+            player = Player("leaderboard", template["stats"], template["attack_style"], offensive_stat, template["prayer"])
+            scores = score_loadouts(player, rows, boss, matrix)
+            scores['offensive_stat'] = np.full(len(rows), offensive_stat, dtype='U8')
+            if best is None:
+                best = scores
+            else:
+                better = scores['dps'] > best['dps']
+                for key in ('attack_roll', 'max_hit', 'dps', 'offensive_stat'):
+                    best[key] = np.where(better, scores[key], best[key])
+
+        for i, weapon in enumerate(type_weapons):
+            entries.append((matrix.names[weapon], attack_type, best['offensive_stat'][i], best['attack_roll'][i],
+                            best['max_hit'][i], best['speed'][i], best['dps'][i]))
+
+    leaderboard = np.array(entries, dtype=LEADERBOARD_DTYPE)
+    return leaderboard[np.argsort(-leaderboard['dps'], kind='stable')]
+
+def _ranged_ammo(matrix: CatalogMatrix, weapon: int) -> int:
+    name = matrix.names[weapon]
+    if name.lower().startswith(AMMOLESS_BOWS):
+        return matrix.empty_row
+    ammo = "Dragon bolts" if matrix.categories[weapon] == "Crossbow" else "Dragon arrow"
+    return matrix.row_of_name.get(ammo, matrix.empty_row)
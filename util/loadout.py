@@ -1,4 +1,5 @@
-from Player import Player, PlayerStats, AttackStyle
+from typing import Dict
+from Player import Player, PlayerStats, AttackStyle, Loadout
 
 def default_loadouts():
     loadouts = {
@@ -74,14 +75,46 @@ def default_loadouts():
     return loadouts
 
 # Function to create a player based on loadout
-def create_player(name, loadout):
-    player = Player(
-        name=name, 
-        stats=loadout["stats"], 
-        attack_style=loadout["attack_style"],  # Flexible attack style
-        offensive_stat=loadout["offensive_stat"],  # Flexible offensive stat
-        prayer_name=loadout["prayer"]
-    )
-    for item in loadout["gear"]:
-        player.equip_item(item)
+def create_player(name, loadout, loadouts=None, rng=None):
+    """
+    Creates a player wearing loadout (a raw dict or a compiled Loadout). Any loadouts passed in (raw dicts or compiled Loadouts)
+    are registered on the player so it can swap between them with switch_loadout.
+    rng replaces the random module for the player's rolls (see util.rng).
+    """
+    if isinstance(loadout, Loadout):
+        # Already compiled, start the player in it without equipping anything
+        player = Player(
+            name=name,
+            stats=loadout.stats,
+            attack_style=loadout.attack_style,
+            offensive_stat=loadout.offensive_stat,
+            rng=rng
+        )
+        player.add_loadout(loadout)
+        player.switch_loadout(loadout.name)
+    else:
+        player = Player(
+            name=name, 
+            stats=loadout["stats"], 
+            attack_style=loadout["attack_style"],  # Flexible attack style
+            offensive_stat=loadout["offensive_stat"],  # Flexible offensive stat
+            prayer_name=loadout["prayer"],
+            rng=rng
+        )
+        for item in loadout["gear"]:
+            player.equip_item(item)
+
+    if loadouts:
+        for loadout_name, switchable in loadouts.items():
+            if not isinstance(switchable, Loadout):
+                switchable = compile_loadout(loadout_name, switchable)
+            player.add_loadout(switchable)
     return player
+
+def compile_loadout(name, loadout) -> Loadout:
+    """Equips a loadout once on a scratch player and freezes the result for switch_loadout."""
+    return create_player(name, loadout).snapshot_loadout(name)
+
+def compile_loadouts(loadouts) -> Dict[str, Loadout]:
+    """Compiles every loadout in a default_loadouts style dict."""
+    return {name: compile_loadout(name, loadout) for name, loadout in loadouts.items()}
@@ -0,0 +1,238 @@
+import heapq
+import math
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from AttackTypes import AttackType
+from Player import CombatProfile, Player, PlayerStats, attack_type_of_category
+from VerzikP2 import VerzikP2
+from util.attack_handler import AttackHandler, attack_distribution, expected_value
+from util.equipment import EquipmentCatalog, load_catalog
+from util.loadout import compile_loadout
+from util.p2_solver import SolverFighter, solve_p2
+
+# Every slot but the weapon, searched in this order after the weapon is fixed
+GEAR_SLOTS = ['head', 'body', 'legs', 'shield', 'cape', 'neck', 'hands', 'feet', 'ring', 'ammo']
+
+# Bows that make their own arrows and leave the ammo slot without a ranged bonus
+AMMOLESS_BOWS = ("crystal bow", "corrupted bow", "bow of faerdhinen")
+
+# (accuracy bonus, strength bonus, item name), None for an empty slot
+Candidate = Tuple[int, int, Optional[str]]
+
+class OptimizedLoadout(NamedTuple):
+    """A loadout found by the optimizer, in the default_loadouts format, with its scores."""
+    loadout: Dict
+    dps: float  # Expected damage per tick
+    attack_roll: int
+    max_hit: int
+    proc_ticks: Optional[float] = None  # Mean solo ticks until reds (objective="proc" only)
+
+    @property
+    def gear(self) -> List[str]:
+        return self.loadout["gear"]
+
+def pareto_front(candidates: List[Candidate]) -> List[Candidate]:
+    """
+    Drops every candidate that another one matches or beats on both accuracy and strength.
+    Of candidates with identical bonuses the shortest name is kept, so base items win over
+    their Last Man Standing/Deadman copies. Sorted by accuracy, best first.
+    """
+    best: Dict[Tuple[int, int], Optional[str]] = {}
+    for accuracy, strength, name in candidates:
+        key = (accuracy, strength)
+        if key not in best or _name_key(name) < _name_key(best[key]):
+            best[key] = name
+
+    front = []
+    top_strength = -math.inf
+    for (accuracy, strength), name in sorted(best.items(), key=lambda entry: (-entry[0][0], -entry[0][1])):
+        if strength > top_strength:
+            front.append((accuracy, strength, name))
+            top_strength = strength
+    return front
+
+def _name_key(name: Optional[str]):
+    return (0, 0, '') if name is None else (1, len(name), name)
+
+class GearOptimizer:
+    """
+    Best-in-slot search over the equipment catalog for one stats block, prayer and style against a boss.
+
+    Expected damage per tick only depends on the weapon and the summed accuracy and strength
+    bonuses of the style, and never decreases as either sum grows. So every slot is cut down to
+    its Pareto front on those two bonuses, and a branch-and-bound search fills slots one at a time,
+    dropping any branch whose damage with the best remaining bonus of every open slot cannot beat
+    the loadouts found so far. Two-handed weapons leave the shield slot empty, bows and crossbows
+    only take arrows and bolts, and Tumeken's shadow triples the gear's magic bonuses through
+    Player.magic_attack_roll and Player.magic_max_hit.
+    """
+    def __init__(self, stats: PlayerStats, prayer: str, attack_style: str, offensive_stat: str, boss,
+                 catalog: Optional[EquipmentCatalog] = None):
+        self.catalog = catalog or load_catalog()
+        self.player = Player("optimizer", stats, attack_style, offensive_stat, prayer)
+        self.stats = stats
+        self.prayer = prayer
+        self.attack_style = attack_style
+        self.offensive_stat = offensive_stat
+        self.boss = boss
+
+        if offensive_stat == "magic":
+            self.attack_type, self.accuracy_key, self.strength_key = AttackType.MAGIC, "magic", "magic_str"
+            defence_style = "magic"
+        elif offensive_stat == "ranged":
+            self.attack_type, self.accuracy_key, self.strength_key = AttackType.RANGED, "ranged", "ranged_str"
+            defence_style = "ranged"
+        else:
+            self.attack_type, self.accuracy_key, self.strength_key = AttackType.MELEE, offensive_stat, "str"
+            defence_style = offensive_stat
+        self.defence_style = defence_style
+        self.defence_roll = AttackHandler(None, boss).lookup_boss_defense_roll(defence_style)
+
+        self.fronts = {slot: pareto_front(self._slot_candidates(slot)) for slot in GEAR_SLOTS}
+        self.ammo_fronts = {
+            "arrow": pareto_front(self._slot_candidates("ammo", lambda name: "arrow" in name.lower())),
+            "bolt": pareto_front(self._slot_candidates("ammo", lambda name: "bolt" in name.lower())),
+        }
+        self._values: Dict[Tuple[str, int, int], float] = {}
+
+    def _unique_items(self, slot: str):
+        """Items of a slot that name lookups resolve to (the first entry of each name)."""
+        for item in self.catalog.items_in_slot(slot):
+            if self.catalog.get(item['name']) is item:
+                yield item
+
+    def _bonuses(self, item: Dict) -> Tuple[int, int]:
+        return item['offensive'].get(self.accuracy_key) or 0, item['bonuses'].get(self.strength_key) or 0
+
+    def _slot_candidates(self, slot: str, accepts=None) -> List[Candidate]:
+        candidates = [(0, 0, None)]
+        for item in self._unique_items(slot):
+            if accepts is None or accepts(item['name']):
+                candidates.append((*self._bonuses(item), item['name']))
+        return candidates
+
+    def weapons(self) -> List[Dict]:
+        """Every weapon of the optimizer's attack type."""
+        return [item for item in self._unique_items("weapon") if attack_type_of_category(item.get('category')) == self.attack_type]
+
+    def profile(self, weapon: Dict, accuracy: int, strength: int) -> CombatProfile:
+        """Combat profile of weapon with the given total bonuses (weapon's own included)."""
+        name = weapon['name']
+        if self.attack_type == AttackType.MAGIC:
+            attack_roll = self.player.magic_attack_roll(accuracy, name)
+            max_hit = self.player.magic_max_hit(strength, name)
+        elif self.attack_type == AttackType.RANGED:
+            attack_roll = self.player.ranged_attack_roll(accuracy)
+            max_hit = self.player.ranged_max_hit(strength)
+        else:
+            attack_roll = self.player.melee_attack_roll(accuracy)
+            max_hit = self.player.melee_max_hit(strength)
+        return CombatProfile(self.attack_type, attack_roll, max_hit, name, weapon.get('speed') or 4, self.defence_style)
+
+    def expected_dps(self, weapon: Dict, accuracy: int, strength: int) -> float:
+        """Expected damage per tick of weapon with the given total bonuses."""
+        key = (weapon['name'], accuracy, strength)
+        value = self._values.get(key)
+        if value is None:
+            profile = self.profile(weapon, accuracy, strength)
+            value = expected_value(attack_distribution(profile, self.defence_roll)) / profile.weapon_speed
+            self._values[key] = value
+        return value
+
+    def slot_fronts(self, weapon: Dict) -> List[List[Candidate]]:
+        """Pareto fronts of the open slots for a weapon."""
+        fronts = []
+        for slot in GEAR_SLOTS:
+            if slot == "shield" and weapon.get('isTwoHanded'):
+                continue
+            if slot == "ammo" and self.attack_type == AttackType.RANGED:
+                if weapon['name'].lower().startswith(AMMOLESS_BOWS):
+                    continue
+                category = weapon.get('category')
+                fronts.append(self.ammo_fronts["bolt" if category == "Crossbow" else "arrow"])
+                continue
+            fronts.append(self.fronts[slot])
+        return fronts
+
+    def best_loadouts(self, top: int = 1) -> List[OptimizedLoadout]:
+        """The top loadouts by expected damage per tick, best first."""
+        # Min-heap of (dps, tie breaker, gear) holding the best loadouts found so far
+        found: List[Tuple[float, int, List[str]]] = []
+
+        def threshold() -> float:
+            return found[0][0] if len(found) >= top else -math.inf
+
+        searches = []
+        for weapon in self.weapons():
+            fronts = self.slot_fronts(weapon)
+            max_accuracy = [0] * (len(fronts) + 1)
+            max_strength = [0] * (len(fronts) + 1)
+            for i in range(len(fronts) - 1, -1, -1):
+                max_accuracy[i] = max_accuracy[i + 1] + max(c[0] for c in fronts[i])
+                max_strength[i] = max_strength[i + 1] + max(c[1] for c in fronts[i])
+            accuracy, strength = self._bonuses(weapon)
+            bound = self.expected_dps(weapon, accuracy + max_accuracy[0], strength + max_strength[0])
+            searches.append((bound, weapon['name'], weapon, fronts, max_accuracy, max_strength))
+
+        # Most promising weapons first, so the threshold rises quickly and the rest are cut early
+        searches.sort(key=lambda search: (-search[0], search[1]))
+        for bound, _, weapon, fronts, max_accuracy, max_strength in searches:
+            if bound <= threshold():
+                break
+
+            def search(i: int, accuracy: int, strength: int, gear: List[str]):
+                if i == len(fronts):
+                    value = self.expected_dps(weapon, accuracy, strength)
+                    if value > threshold():
+                        entry = (value, -len(found), [weapon['name'], *gear])
+                        if len(found) < top:
+                            heapq.heappush(found, entry)
+                        else:
+                            heapq.heapreplace(found, entry)
+                    return
+                if self.expected_dps(weapon, accuracy + max_accuracy[i], strength + max_strength[i]) <= threshold():
+                    return
+                for item_accuracy, item_strength, name in fronts[i]:
+                    search(i + 1, accuracy + item_accuracy, strength + item_strength, gear if name is None else [*gear, name])
+
+            search(0, *self._bonuses(weapon), [])
+
+        return [self._result(gear, value) for value, _, gear in sorted(found, key=lambda entry: (-entry[0], entry[1]))]
+
+    def _result(self, gear: List[str], value: float) -> OptimizedLoadout:
+        weapon = self.catalog[gear[0]]
+        accuracy = sum(self._bonuses(self.catalog[name])[0] for name in gear)
+        strength = sum(self._bonuses(self.catalog[name])[1] for name in gear)
+        profile = self.profile(weapon, accuracy, strength)
+        loadout = {
+            "stats": self.stats,
+            "prayer": self.prayer,
+            "attack_style": self.attack_style,
+            "offensive_stat": self.offensive_stat,
+            "gear": gear,
+        }
+        return OptimizedLoadout(loadout, value, profile.attack_roll, profile.max_hit)
+
+    def proc_ticks(self, result: OptimizedLoadout, scale: int) -> float:
+        """Exact mean ticks for this loadout alone to bring Verzik P2 to reds, via util.p2_solver."""
+        compiled = compile_loadout("optimizer", result.loadout)
+        return float(solve_p2([SolverFighter("optimizer", compiled, VerzikP2(scale=scale))], scale=scale).mean_ticks())
+
+    def optimize(self, objective: str = "dps", top: int = 1, candidates: int = 20, scale: int = 2) -> List[OptimizedLoadout]:
+        """
+        The top loadouts for an objective: "dps" maximizes expected damage per tick, "proc"
+        minimizes the exact mean solo time to Verzik P2 reds. Proc time also depends on how
+        attacks line up with Verzik's attack ticks, so the best candidates by damage are solved
+        exactly and re-ranked.
+        """
+        if objective == "dps":
+            return self.best_loadouts(top)
+        if objective == "proc":
+            ranked = [result._replace(proc_ticks=self.proc_ticks(result, scale)) for result in self.best_loadouts(max(top, candidates))]
+            return sorted(ranked, key=lambda result: result.proc_ticks)[:top]
+        raise ValueError(f"Unknown objective {objective}. Use 'dps' or 'proc'.")
+
+def optimize_loadout(stats: PlayerStats, prayer: str, attack_style: str, offensive_stat: str, boss=None,
+                     objective: str = "dps", scale: int = 2) -> OptimizedLoadout:
+    """Best loadout from equipment.json for a stats block, prayer and style, against Verzik P2 by default."""
+    boss = boss or VerzikP2(scale=scale)
+    return GearOptimizer(stats, prayer, attack_style, offensive_stat, boss).optimize(objective, scale=scale)[0]
@@ -0,0 +1,133 @@
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+from Player import Loadout
+from VerzikP2 import VerzikP2
+from util.attack_handler import AttackHandler, attack_distribution
+
+class SolverAttack:
+    """Damage PMF and speed of one attack made with a compiled loadout."""
+    def __init__(self, loadout: Loadout, boss):
+        profile = loadout.combat_profile
+        defence_roll = AttackHandler(None, boss).lookup_boss_defense_roll(profile.defence_style)
+        self.pmf = np.array(attack_distribution(profile, defence_roll))
+        self.speed = profile.weapon_speed if profile.weapon else 4
+
+class SolverFighter:
+    """
+    A player in an exact P2 solve, same swap rules as BatchFighter:
+    swap to swap_loadout on Verzik's attack tick, or delay the attack by a tick without one.
+    """
+    def __init__(self, name: str, loadout: Loadout, boss, swap_loadout: Optional[Loadout] = None):
+        self.name = name
+        self.attack = SolverAttack(loadout, boss)
+        self.swap_attack = SolverAttack(swap_loadout, boss) if swap_loadout else None
+
+class P2Solution:
+    """Exact joint distribution of (ticks_until_defeat, remaining hp) at the end of P2."""
+    def __init__(self, outcomes: Dict[Tuple[int, int], float], base_hp: int, unresolved: float):
+        self.outcomes = outcomes
+        self.base_hp = base_hp
+        self.unresolved = unresolved  # Probability mass still fighting when the solver stopped
+
+        self.ticks: Dict[int, float] = {}
+        self.proc_percent: Dict[float, float] = {}
+        for (tick, hp), p in sorted(outcomes.items()):
+            proc = hp / base_hp * 100
+            self.ticks[tick] = self.ticks.get(tick, 0.0) + p
+            self.proc_percent[proc] = self.proc_percent.get(proc, 0.0) + p
+
+    def mean_ticks(self) -> float:
+        return sum(tick * p for tick, p in self.ticks.items()) / sum(self.ticks.values())
+
+    def mean_proc_percent(self) -> float:
+        return sum(proc * p for proc, p in self.proc_percent.items()) / sum(self.proc_percent.values())
+
+    def ticks_quantile(self, q: float) -> int:
+        """Smallest tick count whose cumulative probability reaches q."""
+        return _quantile(self.ticks, q)
+
+    def proc_percent_quantile(self, q: float) -> float:
+        """Smallest proc percent whose cumulative probability reaches q."""
+        return _quantile(self.proc_percent, q)
+
+    def probability(self, condition: Callable[[int, float], bool]) -> float:
+        """Probability that condition(ticks_until_defeat, proc_percent) holds."""
+        return sum(p for (tick, hp), p in self.outcomes.items() if condition(tick, hp / self.base_hp * 100))
+
+def _quantile(pmf: Dict, q: float):
+    total = sum(pmf.values())
+    cumulative = 0.0
+    for value in sorted(pmf):
+        cumulative += pmf[value]
+        if cumulative >= q * total:
+            return value
+    return max(pmf)
+
+def solve_p2(fighters: List[SolverFighter], scale: int = 2, tolerance: float = 1e-12, max_ticks: int = 10_000) -> P2Solution:
+    """
+    Computes the exact distribution of the P2 sims' ticks_until_defeat and proc_percent.
+
+    Attack timing only depends on the tick (cooldowns and Verzik's CCCCL counter never branch on
+    damage), so the chain over (hp, cooldowns, attack index) collapses to one hp distribution
+    stepped tick by tick in the order of run_single_simulation.
+    """
+    verzik = VerzikP2(scale=scale)
+    base_hp = verzik.base_hp
+
+    # taken[d] = probability the fight is still going with d damage dealt, capped at base_hp (dead)
+    taken = np.zeros(base_hp + 1)
+    taken[0] = 1.0
+    proc_index = base_hp - verzik.reds_threshold  # Damage taken at which hp <= reds_threshold
+
+    cooldowns = [0] * len(fighters)
+    ticks_since_attack = 0
+    attack_index = 0
+    outcomes: Dict[Tuple[int, int], float] = {}
+
+    tick = 0
+    while taken.sum() > tolerance and tick < max_ticks:
+        verzik_attacking = ticks_since_attack == verzik.attack_cooldown_ticks
+
+        for f, fighter in enumerate(fighters):
+            if cooldowns[f] != 0:
+                continue
+            if fighter.swap_attack is None and verzik_attacking:
+                cooldowns[f] = 1
+                continue
+            attack = fighter.swap_attack if verzik_attacking else fighter.attack
+            taken = _apply_damage(taken, attack.pmf, base_hp)
+            cooldowns[f] = attack.speed
+
+        cooldowns = [cooldown - 1 if cooldown > 0 else 0 for cooldown in cooldowns]
+        tick += 1
+
+        # Dead lanes end the fight before Verzik acts
+        if taken[base_hp]:
+            outcomes[(tick, 0)] = outcomes.get((tick, 0), 0.0) + taken[base_hp]
+            taken[base_hp] = 0.0
+
+        if verzik_attacking:
+            for damage in np.nonzero(taken[proc_index:])[0] + proc_index:
+                hp = base_hp - int(damage)
+                outcomes[(tick, hp)] = outcomes.get((tick, hp), 0.0) + taken[damage]
+            taken[proc_index:] = 0.0
+
+            if verzik.attack_pattern[attack_index] == 'L':
+                taken = _apply_damage(taken, _point_mass(verzik.lightning_damage), base_hp)
+            attack_index = (attack_index + 1) % len(verzik.attack_pattern)
+            ticks_since_attack = 0
+        else:
+            ticks_since_attack += 1
+
+    return P2Solution(outcomes, base_hp, unresolved=float(taken.sum()))
+
+def _point_mass(damage: int) -> np.ndarray:
+    pmf = np.zeros(damage + 1)
+    pmf[damage] = 1.0
+    return pmf
+
+def _apply_damage(taken: np.ndarray, pmf: np.ndarray, base_hp: int) -> np.ndarray:
+    """Adds an independent damage draw to the damage-taken distribution, clamping overkill at base_hp."""
+    result = np.convolve(taken, pmf)
+    result[base_hp] = result[base_hp:].sum()
+    return result[:base_hp + 1]
@@ -0,0 +1,260 @@
+import cProfile
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+from Player import Player
+from VerzikP2 import VerzikP2
+from util import loadout
+from util.attack_handler import AttackHandler
+
+# Hot paths counted while profiling: (name, owner, attribute). Module functions are rebound in
+# every loaded module that imported them, so `from util.loadout import create_player` is counted too.
+HOT_PATHS = [
+    ("AttackHandler.perform_attack", AttackHandler, "perform_attack"),
+    ("create_player", loadout, "create_player"),
+    ("Player.tick", Player, "tick"),
+    ("VerzikP2.simulate_tick", VerzikP2, "simulate_tick"),
+]
+
+class ChunkTiming(NamedTuple):
+    """Where the wall time of one runner chunk went, in seconds."""
+    start: int           # First iteration
+    stop: int            # One past the last iteration
+    pid: int             # Worker that ran it
+    dispatch: float      # Submit until the worker started it: queueing and sending the task
+    compute: float       # Running the fights
+    transfer: float      # Worker done until the result was back: pickling and sending the records
+    result_bytes: int    # Pickled size of the result
+
+class ProfileReport:
+    """
+    Mergeable profile of a run: call counts and cumulative time of HOT_PATHS, tracemalloc peak per
+    worker process, per-chunk timings, and optionally the full cProfile statistics. Workers each
+    fill one report per chunk and the runner merges them, like util.aggregate.ResultAggregate.
+    Both cProfile and tracemalloc slow the profiled code down several times, so the counted times
+    are only comparable between runs profiled with the same settings.
+    """
+    def __init__(self, cprofile: bool = False, memory: bool = True):
+        self.cprofile = cprofile
+        self.memory = memory
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.wall: float = 0.0  # Seconds spent profiling, summed over workers
+        self.peak_memory: Dict[int, int] = {}  # pid -> tracemalloc peak bytes
+        self.chunks: List[ChunkTiming] = []
+        self.stats: Dict = {}  # pstats.Stats.stats, when cprofile
+
+    def empty_copy(self) -> "ProfileReport":
+        """An empty report with the same settings, to send to workers."""
+        return ProfileReport(self.cprofile, self.memory)
+
+    def merge(self, other: "ProfileReport"):
+        for name, calls in other.calls.items():
+            self.calls[name] += calls
+            self.seconds[name] += other.seconds[name]
+        self.wall += other.wall
+        for pid, peak in other.peak_memory.items():
+            self.peak_memory[pid] = max(self.peak_memory.get(pid, 0), peak)
+        self.chunks.extend(other.chunks)
+        if other.stats:
+            self.stats = _merge_stats(self.stats, other.stats)
+
+    def pstats(self) -> pstats.Stats:
+        """The cProfile statistics as a pstats.Stats (empty unless profiled with cprofile)."""
+        stats = pstats.Stats()
+        stats.stats = dict(self.stats)
+        stats.total_calls = sum(entry[1] for entry in self.stats.values())
+        stats.prim_calls = sum(entry[0] for entry in self.stats.values())
+        stats.total_tt = sum(entry[2] for entry in self.stats.values())
+        return stats
+
+    def summary(self) -> Dict:
+        functions = {
+            name: {
+                'calls': self.calls[name],
+                'seconds': self.seconds[name],
+                'ns_per_call': self.seconds[name] / self.calls[name] * 1e9 if self.calls[name] else 0.0,
+                'share': self.seconds[name] / self.wall if self.wall else 0.0,
+            }
+            for name, _, _ in HOT_PATHS
+        }
+        chunks = {}
+        if self.chunks:
+            chunks = {
+                'count': len(self.chunks),
+                'dispatch': sum(chunk.dispatch for chunk in self.chunks),
+                'compute': sum(chunk.compute for chunk in self.chunks),
+                'transfer': sum(chunk.transfer for chunk in self.chunks),
+                'result_bytes': sum(chunk.result_bytes for chunk in self.chunks),
+            }
+        return {'wall': self.wall, 'functions': functions, 'peak_memory': dict(self.peak_memory), 'chunks': chunks}
+
+    def lines(self) -> List[str]:
+        """Human readable summary."""
+        summary = self.summary()
+        lines = [f"{'function':<30} {'calls':>12} {'total s':>10} {'ns/call':>10} {'share':>7}"]
+        for name, entry in summary['functions'].items():
+            lines.append(f"{name:<30} {entry['calls']:>12,} {entry['seconds']:>10.3f} {entry['ns_per_call']:>10,.0f} {entry['share']:>7.1%}")
+        lines.append(f"profiled wall time {summary['wall']:.3f} s (cumulative times nest, so shares can add up past 100%)")
+        for pid, peak in sorted(summary['peak_memory'].items()):
+            lines.append(f"worker {pid}: tracemalloc peak {peak / 2 ** 20:.2f} MiB")
+        chunks = summary['chunks']
+        if chunks:
+            count = chunks['count']
+            lines.append(f"{count} chunks: dispatch {chunks['dispatch'] / count * 1e3:.2f} ms, compute {chunks['compute'] / count * 1e3:.2f} ms, "
+                         f"transfer {chunks['transfer'] / count * 1e3:.2f} ms, result {chunks['result_bytes'] / count / 1024:.1f} KiB per chunk")
+        return lines
+
+    def export(self, path: str):
+        """
+        Writes the cProfile statistics: a pstats file for .prof/.pstats paths (snakeviz, pstats),
+        otherwise collapsed stacks for flamegraph.pl or speedscope.
+        """
+        if not self.stats:
+            raise ValueError("No cProfile statistics to export. Profile with ProfileReport(cprofile=True).")
+        if Path(path).suffix in ('.prof', '.pstats'):
+            self.pstats().dump_stats(path)
+        else:
+            write_collapsed_stacks(path, self.stats)
+
+class Profiler:
+    """
+    Context manager that profiles the code it wraps into report. Counting wrappers are only
+    installed on HOT_PATHS while it is active, so runs without one pay nothing.
+
+        with Profiler(ProfileReport(cprofile=True)) as profiler:
+            simulate_fight(scenario, 1)
+        print("\\n".join(profiler.report.lines()))
+    """
+    _active = False  # One per process: the wrappers are installed on shared classes
+
+    def __init__(self, report: Optional[ProfileReport] = None):
+        self.report = report if report is not None else ProfileReport()
+        self._profile = None
+        self._originals: List = []
+        self._started_tracing = False
+        self._start = 0.0
+
+    def __enter__(self) -> "Profiler":
+        if Profiler._active:
+            raise RuntimeError("A Profiler is already active in this process")
+        Profiler._active = True
+        self._originals = _install(self.report)
+        if self.report.memory:
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        if self.report.cprofile:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.report.wall += time.perf_counter() - self._start
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.create_stats()
+            self.report.stats = _merge_stats(self.report.stats, self._profile.stats)
+        if self.report.memory:
+            pid = os.getpid()
+            self.report.peak_memory[pid] = max(self.report.peak_memory.get(pid, 0), tracemalloc.get_traced_memory()[1])
+            if self._started_tracing:
+                tracemalloc.stop()
+        _uninstall(self._originals)
+        self._originals = []
+        Profiler._active = False
+        return False
+
+def _counted(function, name: str, report: ProfileReport):
+    calls, seconds = report.calls, report.seconds
+    clock = time.perf_counter
+
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            seconds[name] += clock() - start
+            calls[name] += 1
+    wrapper.__wrapped__ = function
+    return wrapper
+
+def _install(report: ProfileReport) -> List:
+    originals = []
+    for name, owner, attribute in HOT_PATHS:
+        function = getattr(owner, attribute)
+        wrapper = _counted(function, name, report)
+        if isinstance(owner, type):
+            owners = [owner]
+        else:
+            owners = [module for module in list(sys.modules.values()) if getattr(module, attribute, None) is function]
+        for target in owners:
+            originals.append((target, attribute, function))
+            setattr(target, attribute, wrapper)
+    return originals
+
+def _uninstall(originals: List):
+    for target, attribute, function in reversed(originals):
+        setattr(target, attribute, function)
+
+def _merge_stats(first: Dict, second: Dict) -> Dict:
+    """Adds two pstats.Stats.stats tables, as pstats.Stats.add does."""
+    merged = dict(first)
+    for function, entry in second.items():
+        if function in merged:
+            merged[function] = pstats.add_func_stats(merged[function], entry)
+        else:
+            merged[function] = entry
+    return merged
+
+def _label(function) -> str:
+    filename, line, name = function
+    if filename == '~':
+        return name  # Built-in
+    return f"{name} ({Path(filename).name}:{line})"
+
+def collapsed_stacks(stats: Dict, min_share: float = 1e-4) -> Dict[str, float]:
+    """
+    Folds pstats statistics into collapsed stacks, {"root;caller;function": self seconds}.
+    cProfile only records caller -> callee edges, not whole stacks, so each function's own time is
+    spread over its callers in proportion to the time spent through each, recursively. Paths below
+    min_share of a function's time are dropped, and recursion stops at the first repeated function.
+    """
+    def paths(function, seen, weight):
+        callers = {caller: edge for caller, edge in stats[function][4].items() if caller in stats and caller not in seen}
+        weights = {caller: edge[3] for caller, edge in callers.items()}
+        total = sum(weights.values())
+        if not total:
+            weights = {caller: edge[1] for caller, edge in callers.items()}
+            total = sum(weights.values())
+        if not total:
+            yield [_label(function)], weight
+            return
+        for caller, caller_weight in weights.items():
+            share = weight * caller_weight / total
+            if share >= min_share:
+                for path, path_share in paths(caller, seen | {function}, share):
+                    yield path + [_label(function)], path_share
+
+    stacks: Dict[str, float] = defaultdict(float)
+    for function, (_, _, own_time, _, _) in stats.items():
+        if own_time <= 0:
+            continue
+        for path, share in paths(function, frozenset(), 1.0):
+            stacks[";".join(path)] += own_time * share
+    return dict(stacks)
+
+def write_collapsed_stacks(path: str, stats: Dict):
+    """Writes collapsed stacks with microsecond counts, one "stack count" line each."""
+    with open(path, 'w') as file:
+        for stack, seconds in sorted(collapsed_stacks(stats).items()):
+            microseconds = round(seconds * 1e6)
+            if microseconds:
+                file.write(f"{stack} {microseconds}\n")
@@ -0,0 +1,115 @@
+import json
+import numpy as np
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Dict, List, Optional
+from util.engine import ScenarioSimulation, run_scenario
+from util.result_cache import ResultCache, scenario_key
+from util.runner import create_executor
+from util.scenario import Scenario
+
+class TickDistribution:
+    """Probability of every tick count, pmf[t] = P(ticks == t)."""
+    def __init__(self, pmf: np.ndarray, count: int = 0):
+        self.pmf = np.asarray(pmf, dtype=np.float64)
+        self.count = count  # Fights it was estimated from, 0 for derived distributions
+
+    @classmethod
+    def from_ticks(cls, ticks: np.ndarray) -> "TickDistribution":
+        ticks = np.asarray(ticks, dtype=np.int64)
+        return cls(np.bincount(ticks) / len(ticks), len(ticks))
+
+    def __add__(self, other: "TickDistribution") -> "TickDistribution":
+        """Distribution of the sum of two independent tick counts."""
+        return TickDistribution(np.convolve(self.pmf, other.pmf), min(self.count, other.count))
+
+    def shift(self, ticks: int) -> "TickDistribution":
+        """Distribution of this tick count plus a fixed number of ticks."""
+        return TickDistribution(np.concatenate([np.zeros(ticks), self.pmf]), self.count)
+
+    def mean(self) -> float:
+        return float(np.dot(np.arange(len(self.pmf)), self.pmf))
+
+    def std(self) -> float:
+        ticks = np.arange(len(self.pmf))
+        return float(np.sqrt(np.dot((ticks - self.mean()) ** 2, self.pmf)))
+
+    def quantile(self, q: float) -> int:
+        """Smallest tick count whose cumulative probability reaches q."""
+        return int(np.searchsorted(np.cumsum(self.pmf), q * self.pmf.sum() - 1e-12))
+
+    def probability_below(self, ticks: int) -> float:
+        """P(tick count < ticks)."""
+        return float(self.pmf[:max(ticks, 0)].sum())
+
+    def summary(self, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)) -> Dict:
+        summary = {'count': self.count, 'mean': self.mean(), 'std': self.std()}
+        summary.update({f"q{int(q * 100):02d}": self.quantile(q) for q in quantiles})
+        return summary
+
+class Raid:
+    """
+    Rooms fought one after another. between_rooms is a fixed number of ticks added per room
+    transition (walking, setting up). Rooms are assumed independent, so the raid's tick
+    distribution is the convolution of the room distributions.
+    """
+    def __init__(self, name: str, rooms: List[Scenario], between_rooms: int = 0):
+        names = [room.name for room in rooms]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Raid {name} has rooms with the same name, room names must be unique.")
+        self.name = name
+        self.rooms = rooms
+        self.between_rooms = between_rooms
+
+    @classmethod
+    def from_file(cls, path: str) -> "Raid":
+        """
+        Loads a raid JSON file: {"name": ..., "rooms": [scenario file or inline scenario, ...], "between_rooms": ticks}.
+        Room file paths are relative to the raid file.
+        """
+        path = Path(path)
+        with open(path, 'r') as file:
+            data = json.load(file)
+        rooms = [Scenario.from_file(str(path.parent / room)) if isinstance(room, str) else Scenario.from_dict(room) for room in data["rooms"]]
+        return cls(data["name"], rooms, data.get("between_rooms", 0))
+
+class RaidResult:
+    """Tick distribution of every room and of the whole raid."""
+    def __init__(self, raid: Raid, rooms: Dict[str, TickDistribution], simulated: List[str]):
+        self.raid = raid
+        self.rooms = rooms
+        self.simulated = simulated  # Rooms that needed fights simulated, the rest came from the cache
+
+        total = TickDistribution(np.ones(1))
+        for i, distribution in enumerate(rooms.values()):
+            total = total + (distribution.shift(raid.between_rooms) if i else distribution)
+        self.total = total
+
+def cached_fights(scenario: Scenario, cache: ResultCache) -> int:
+    """Number of the scenario's fights already in cache."""
+    return len(cache.load(scenario_key(scenario), ScenarioSimulation(scenario).dtype))
+
+def room_distribution(scenario: Scenario, n: Optional[int] = None, cache: Optional[ResultCache] = None, executor=None,
+                      **runner_options) -> TickDistribution:
+    """
+    A room's tick distribution over n fights. With a util.result_cache.ResultCache, cached fights
+    are reused and only the iterations missing from it are simulated.
+    """
+    results = run_scenario(scenario, n, executor=executor, cache=cache, **runner_options)
+    return TickDistribution.from_ticks(results['ticks_until_defeat'])
+
+def run_raid(raid: Raid, n: Optional[int] = None, cache: Optional[ResultCache] = None, max_workers: Optional[int] = None,
+             **runner_options) -> RaidResult:
+    """
+    Whole-raid tick distribution from per-room distributions. Fights of every room are kept in
+    cache, so rooms already cached with enough fights are reused and the others only simulate the
+    fights they are missing, through one warm process pool, then the rooms are convolved.
+    """
+    cache = cache if cache is not None else ResultCache()
+    rooms: Dict[str, TickDistribution] = {}
+    simulated = [room.name for room in raid.rooms if cached_fights(room, cache) < (n or room.iterations)]
+    # A fully cached raid never needs the process pool
+    with create_executor(max_workers) if simulated else nullcontext() as executor:
+        for room in raid.rooms:
+            rooms[room.name] = room_distribution(room, n, cache, executor, max_workers=max_workers, **runner_options)
+    return RaidResult(raid, rooms, simulated)
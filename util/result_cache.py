@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+import numpy as np
+from pathlib import Path
+from typing import Optional
+from util.equipment import load_catalog
+from util.scenario import Scenario
+
+DEFAULT_CACHE_DIR = ".result_cache"
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules whose code decides how a fight goes. Editing any of them invalidates every cached result.
+SIMULATOR_SOURCES = [
+    "AttackTypes.py", "Maiden.py", "Player.py", "Prayer.py", "VerzikP2.py",
+    "util/attack_handler.py", "util/engine.py", "util/equipment.py", "util/loadout.py", "util/player_info.py",
+    "util/powered_staves_data.py", "util/rng.py", "util/scenario.py", "util/scheduler.py",
+]
+
+_code_version: Optional[str] = None
+
+def code_version() -> str:
+    """sha256 over SIMULATOR_SOURCES, computed once per process."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        for source in SIMULATOR_SOURCES:
+            digest.update(source.encode())
+            digest.update((ROOT / source).read_bytes())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+def scenario_key(scenario: Scenario) -> str:
+    """
+    Canonical hash of a scenario's results: its fight_key (boss, scale, players and swap policies,
+    loadouts with gear and prayers, seed) with the simulator code and equipment.json versions.
+    """
+    stamp = {
+        'fight': scenario.fight_key,
+        'code': code_version(),
+        'equipment': load_catalog().source_hash,
+    }
+    return hashlib.sha256(json.dumps(stamp, sort_keys=True).encode()).hexdigest()
+
+class ResultCache:
+    """
+    Fight records on disk, one .npy per scenario key holding iterations 1..k in order. Asking
+    for more fights than are cached only simulates the missing iterations (see engine.run_scenario);
+    with a seed those are exactly the fights a fresh run would have produced.
+    """
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR):
+        self.directory = Path(directory)
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.npy"
+
+    def load(self, key: str, dtype: np.dtype) -> np.ndarray:
+        """Cached records for key, empty if there are none or they have another layout."""
+        path = self.path(key)
+        if path.exists():
+            records = np.load(path)
+            if records.dtype == dtype:
+                return records
+        return np.zeros(0, dtype=dtype)
+
+    def save(self, key: str, records: np.ndarray):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so concurrent runs never read a half-written cache
+        tmp = self.directory / f"{key}.{os.getpid()}.tmp.npy"
+        np.save(tmp, records)
+        tmp.replace(self.path(key))
@@ -0,0 +1,147 @@
+import csv
+import numpy as np
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+def result_dtype(columns) -> np.dtype:
+    """Record layout of one fight: integer iteration and tick count, float percentages."""
+    integer_columns = {'iter': np.int64, 'ticks_until_defeat': np.int32}
+    return np.dtype([(column, integer_columns.get(column, np.float64)) for column in columns])
+
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+NPY_MAX_ROWS = 10 ** 18  # Header space is reserved for a row count this large
+
+class NpyResultWriter:
+    """
+    Streams record batches into a .npy file. The header is padded to a fixed size when opened
+    and rewritten with the final row count on close, so np.load can memory-map the result.
+    """
+    def __init__(self, path: str, dtype: np.dtype):
+        self.path = Path(path)
+        self.dtype = np.dtype(dtype)
+        self.rows = 0
+        self.file = open(self.path, 'wb')
+        self.header_size = len(self._header(NPY_MAX_ROWS))
+        self.file.write(self._header(0))
+
+    def _header(self, rows: int) -> bytes:
+        header = repr({'descr': np.lib.format.dtype_to_descr(self.dtype), 'fortran_order': False, 'shape': (rows,)})
+        # Pad so every header has the same length and the data starts 64-byte aligned
+        size = getattr(self, 'header_size', None)
+        if size is None:
+            size = -(-(len(NPY_MAGIC) + 2 + len(header) + 1) // 64) * 64
+        header = header.ljust(size - len(NPY_MAGIC) - 2 - 1) + '\n'
+        return NPY_MAGIC + len(header).to_bytes(2, 'little') + header.encode('latin1')
+
+    def write(self, batch: np.ndarray):
+        self.file.write(np.ascontiguousarray(batch, dtype=self.dtype).tobytes())
+        self.rows += len(batch)
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.file.seek(0)
+        self.file.write(self._header(self.rows))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class CsvResultWriter:
+    """Streams record batches into a CSV file with a header row of the field names."""
+    def __init__(self, path: str, dtype: np.dtype):
+        self.path = Path(path)
+        self.dtype = np.dtype(dtype)
+        self.rows = 0
+        self.file = open(self.path, mode='w', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.dtype.names)
+
+    def write(self, batch: np.ndarray):
+        self.writer.writerows(batch.tolist())
+        self.rows += len(batch)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class ParquetResultWriter:
+    """Streams record batches into a Parquet file, one row group per batch. Needs pyarrow."""
+    def __init__(self, path: str, dtype: np.dtype):
+        if pq is None:
+            raise ImportError("Writing Parquet results requires pyarrow.")
+        self.path = Path(path)
+        self.dtype = np.dtype(dtype)
+        self.rows = 0
+        schema = pa.schema([(name, pa.from_numpy_dtype(self.dtype[name])) for name in self.dtype.names])
+        self.writer = pq.ParquetWriter(str(self.path), schema)
+
+    def write(self, batch: np.ndarray):
+        self.writer.write_table(pa.table({name: batch[name] for name in self.dtype.names}))
+        self.rows += len(batch)
+
+    def close(self):
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+WRITERS = {
+    '.npy': NpyResultWriter,
+    '.csv': CsvResultWriter,
+    '.parquet': ParquetResultWriter,
+}
+
+def open_result_writer(path: str, dtype: np.dtype):
+    """Opens a streaming writer for path, picking the format from the file extension."""
+    suffix = Path(path).suffix.lower()
+    if suffix not in WRITERS:
+        raise ValueError(f"Unsupported results format {suffix}. Use one of {', '.join(WRITERS)}.")
+    return WRITERS[suffix](path, dtype)
+
+def read_results(path: str, mmap: bool = True) -> np.ndarray:
+    """
+    Loads results written by any writer as a record array.
+    .npy files are memory-mapped by default, so even very large runs open instantly.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == '.npy':
+        return np.load(path, mmap_mode='r' if mmap else None)
+    if suffix == '.parquet':
+        if pq is None:
+            raise ImportError("Reading Parquet results requires pyarrow.")
+        table = pq.read_table(path)
+        records = np.empty(table.num_rows, dtype=[(name, table.schema.field(name).type.to_pandas_dtype()) for name in table.column_names])
+        for name in table.column_names:
+            records[name] = table.column(name).to_numpy()
+        return records
+    if suffix == '.csv':
+        return _read_csv(path)
+    raise ValueError(f"Unsupported results format {suffix}.")
+
+def _read_csv(path: str) -> np.ndarray:
+    with open(path, 'r', newline='') as file:
+        header = next(csv.reader(file))
+    return np.atleast_1d(np.loadtxt(path, delimiter=',', skiprows=1, dtype=result_dtype(header)))
+
+def results_to_dataframe(results: np.ndarray):
+    """Wraps a record array in a pandas DataFrame for analysis."""
+    import pandas as pd
+
+    return pd.DataFrame({name: np.asarray(results[name]) for name in results.dtype.names})
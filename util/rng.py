@@ -0,0 +1,53 @@
+import numpy as np
+from typing import Optional, Sequence
+
+class FightRandom:
+    """
+    Buffered random source with the slice of the `random` module API the simulator uses.
+    Uniform floats are drawn from a PCG64 stream in blocks and mapped to bounded integers by
+    multiply-and-floor, so each randint is a list read instead of a call into the Mersenne Twister.
+
+    A stream is addressed by (seed, iteration): the same pair always replays the same fight, no
+    matter which worker runs it, and different iterations get statistically independent streams.
+    """
+    def __init__(self, seed: Optional[int] = None, iteration: Optional[int] = None, block_size: int = 1024):
+        spawn_key = () if iteration is None else (iteration,)
+        self.seed_sequence = np.random.SeedSequence(seed, spawn_key=spawn_key)
+        self.generator = np.random.Generator(np.random.PCG64(self.seed_sequence))
+        self.block_size = block_size
+        self.buffer = []
+        self.index = 0
+
+    def _refill(self):
+        self.buffer = self.generator.random(self.block_size).tolist()
+        self.index = 0
+
+    def random(self) -> float:
+        """Uniform float in [0, 1)."""
+        if self.index == len(self.buffer):
+            self._refill()
+        u = self.buffer[self.index]
+        self.index += 1
+        return u
+
+    def randint(self, a: int, b: int) -> int:
+        """Uniform integer in [a, b], both ends inclusive, like random.randint."""
+        if self.index == len(self.buffer):
+            self._refill()
+        u = self.buffer[self.index]
+        self.index += 1
+        return a + int(u * (b - a + 1))
+
+    def choice(self, seq: Sequence):
+        """Uniformly chosen element of a non-empty sequence."""
+        return seq[self.randint(0, len(seq) - 1)]
+
+def fight_random(seed: Optional[int], iteration: int) -> FightRandom:
+    """The stream for one fight of a seeded run. Without a seed, fresh OS entropy is used."""
+    return FightRandom(seed, iteration if seed is not None else None)
+
+def batch_generator(seed: Optional[int], chunk: int = 0) -> np.random.Generator:
+    """NumPy generator for one chunk of a batch-engine run, spawned from seed like FightRandom."""
+    # The leading 2**32 keeps batch streams apart from the per-iteration FightRandom streams
+    spawn_key = () if seed is None else (1 << 32, chunk)
+    return np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed, spawn_key=spawn_key)))
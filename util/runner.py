@@ -0,0 +1,144 @@
+import csv
+import os
+import pickle
+import time
+import numpy as np
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+from tqdm import tqdm
+from util.aggregate import ResultAggregate, aggregate_batch
+from util.equipment import load_catalog
+from util.loadout import compile_loadouts, default_loadouts
+from util.profiling import ChunkTiming, Profiler, ProfileReport
+from util.results import result_dtype
+
+RESULT_COLUMNS = ['iter', 'ticks_until_defeat', 'mage_dmg_percent', 'range_dmg_percent', 'proc_percent']
+
+RESULT_DTYPE = result_dtype(RESULT_COLUMNS)
+
+# Per-process state built once by init_worker
+_worker_state: Dict = {}
+
+def init_worker(loadouts_factory: Callable[[], Dict] = default_loadouts):
+    """Loads the catalog and compiles the loadouts once per worker process."""
+    load_catalog()
+    _worker_state['loadouts'] = compile_loadouts(loadouts_factory())
+
+def worker_loadouts() -> Dict:
+    """Compiled loadouts of the current process, built on first use outside a pool."""
+    if 'loadouts' not in _worker_state:
+        init_worker()
+    return _worker_state['loadouts']
+
+def run_batch(simulate: Callable, start: int, stop: int, aggregate: bool = False, template: Optional[ResultAggregate] = None,
+              profile: Optional[ProfileReport] = None):
+    """
+    Runs iterations [start, stop) in this process and packs the rows into one record array,
+    or with aggregate into a ResultAggregate, shaped like template (an empty ResultAggregate) if given.
+    simulate may provide its own loadouts() and dtype, as engine.ScenarioSimulation does.
+    With profile (an empty util.profiling.ProfileReport), the batch is profiled into it and
+    (batch, profile, started, finished) is returned, the times being time.time() stamps.
+    """
+    if profile is not None:
+        started = time.time()
+        with Profiler(profile):
+            batch = run_batch(simulate, start, stop, aggregate, template)
+        finished = time.time()
+        profile.chunks.append(ChunkTiming(start, stop, os.getpid(), 0.0, finished - started, 0.0, len(pickle.dumps(batch))))
+        return batch, profile, started, finished
+
+    loadouts = simulate.loadouts() if hasattr(simulate, 'loadouts') else worker_loadouts()
+    rows = [tuple(simulate(iteration, loadouts)) for iteration in range(start, stop)]
+    records = np.array(rows, dtype=getattr(simulate, 'dtype', RESULT_DTYPE))
+    if not aggregate:
+        return records
+    return aggregate_batch(records, template)
+
+def create_executor(max_workers: Optional[int] = None, loadouts_factory: Callable[[], Dict] = default_loadouts) -> ProcessPoolExecutor:
+    """A process pool whose workers load the catalog and compile loadouts once, at start."""
+    return ProcessPoolExecutor(max_workers=max_workers or os.cpu_count() or 1, initializer=init_worker, initargs=(loadouts_factory,))
+
+def run_simulations_in_parallel(simulate: Callable, n: int, chunk_size: int = 500, max_in_flight: Optional[int] = None,
+                                max_workers: Optional[int] = None, loadouts_factory: Callable[[], Dict] = default_loadouts,
+                                executor: Optional[ProcessPoolExecutor] = None, desc: str = "Simulating",
+                                sink: Optional[Callable[[np.ndarray], None]] = None, aggregate: bool = False,
+                                template: Optional[ResultAggregate] = None, first_iteration: int = 1,
+                                profile: Optional[ProfileReport] = None):
+    """
+    Runs simulate(iteration, loadouts) for n iterations from first_iteration across a process pool.
+    Work is sent in chunks of chunk_size iterations with at most max_in_flight chunks queued,
+    so memory stays bounded however large n is. Returns one record per fight.
+    Pass an executor to reuse a warm pool across runs. With a sink (e.g. a util.results writer's
+    write method), each batch is handed over as it arrives and nothing is kept or returned.
+    With aggregate, workers summarise each chunk into a ResultAggregate and the merged
+    aggregate is returned instead of any rows. Pass an empty ResultAggregate as template to track events.
+    With profile (a util.profiling.ProfileReport), every chunk is profiled in its worker, with
+    its dispatch and transfer times measured here, and the workers' reports are merged into it.
+    """
+    if executor is None:
+        with create_executor(max_workers, loadouts_factory) as executor:
+            return run_simulations_in_parallel(simulate, n, chunk_size, max_in_flight, max_workers, executor=executor,
+                                               desc=desc, sink=sink, aggregate=aggregate, template=template,
+                                               first_iteration=first_iteration, profile=profile)
+
+    max_in_flight = max_in_flight or 2 * (max_workers or os.cpu_count() or 1)
+    end = first_iteration + n
+    chunks = ((start, min(start + chunk_size, end)) for start in range(first_iteration, end, chunk_size))
+    dtype = getattr(simulate, 'dtype', RESULT_DTYPE)
+    results: List[np.ndarray] = []
+    total = None
+    if aggregate:
+        total = template.empty_copy() if template is not None else ResultAggregate(list(dtype.names))
+
+    worker_profile = profile.empty_copy() if profile is not None else None
+    submitted: Dict = {}  # future -> submit time, when profiling
+    received: Dict = {}   # future -> time its result arrived, when profiling
+
+    if total is not None:
+        handle = total.merge
+    elif sink is not None:
+        handle = sink
+    else:
+        handle = results.append
+
+    with tqdm(total=n, desc=desc) as progress:
+        pending = set()
+        for start, stop in chunks:
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                _collect(done, handle, progress, profile, submitted, received)
+            future = executor.submit(run_batch, simulate, start, stop, aggregate, template, worker_profile)
+            if profile is not None:
+                submitted[future] = time.time()
+                future.add_done_callback(lambda done: received.setdefault(done, time.time()))
+            pending.add(future)
+        _collect(pending, handle, progress, profile, submitted, received)
+
+    if total is not None:
+        return total
+    if sink is not None:
+        return None
+    return np.concatenate(results) if results else np.zeros(0, dtype=dtype)
+
+def _collect(futures, handle: Callable, progress: tqdm, profile: Optional[ProfileReport] = None,
+             submitted: Optional[Dict] = None, received: Optional[Dict] = None):
+    for future in futures:
+        batch = future.result()
+        if profile is not None:
+            batch, report, started, finished = batch
+            chunk = report.chunks[-1]
+            report.chunks[-1] = chunk._replace(dispatch=started - submitted.pop(future), transfer=received.pop(future, time.time()) - finished)
+            profile.merge(report)
+        handle(batch)
+        progress.update(len(batch))
+
+# Function to save results to a CSV file
+def save_results_to_csv(results, filename):
+    with open(filename, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        if isinstance(results, np.ndarray) and results.dtype.names:
+            writer.writerow(results.dtype.names)
+            writer.writerows(results.tolist())
+        else:
+            writer.writerow(RESULT_COLUMNS)
+            writer.writerows(results)
@@ -0,0 +1,161 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+from Maiden import Maiden
+from Player import PlayerStats
+from VerzikP2 import VerzikP2
+from util.loadout import default_loadouts
+
+BOSSES = {
+    "VerzikP2": VerzikP2,
+    "Maiden": Maiden,
+}
+BOSS_ATTACK_POLICIES = ("delay", "swap", "attack")
+NYLOCAS_POLICIES = ("ignore", "freeze", "kill")
+STAT_FIELDS = {
+    "attack": "attack_level",
+    "strength": "strength_level",
+    "defense": "defense_level",
+    "magic": "magic_level",
+    "ranged": "ranged_level",
+    "hp": "hitpoints_level",
+}
+
+class PlayerSpec:
+    """
+    One player of a scenario.
+    on_boss_attack decides what the player does when its attack lands on the boss's attack tick:
+    "delay" waits a tick, "swap" attacks in swap_loadout and swaps straight back, "attack" ignores it.
+    on_nylocas decides what the player does with Maiden's Nylocas, up to nylocas_per_spawn of each
+    spawn (all of them when None): "freeze" spends an attack freezing the closest unfrozen one for
+    Maiden.NYLOCAS_FREEZE_TICKS, "kill" attacks the closest one until it dies, "ignore" leaves them.
+    Attacks on Nylocas roll against Maiden's defence and don't count towards the damage columns.
+    """
+    def __init__(self, name: str, loadout: str, on_boss_attack: str = "delay", swap_loadout: Optional[str] = None,
+                 thrall: bool = True, damage_column: Optional[str] = None, on_nylocas: str = "ignore",
+                 nylocas_per_spawn: Optional[int] = None):
+        if on_boss_attack not in BOSS_ATTACK_POLICIES:
+            raise ValueError(f"Unknown on_boss_attack policy {on_boss_attack} for {name}.")
+        if on_nylocas not in NYLOCAS_POLICIES:
+            raise ValueError(f"Unknown on_nylocas policy {on_nylocas} for {name}.")
+        if on_boss_attack == "swap" and not swap_loadout:
+            raise ValueError(f"{name} swaps on the boss's attack tick but has no swap_loadout.")
+
+        self.name = name
+        self.loadout = loadout
+        self.on_boss_attack = on_boss_attack
+        self.swap_loadout = swap_loadout
+        self.thrall = thrall
+        self.damage_column = damage_column or f"{name.lower()}_dmg_percent"
+        self.on_nylocas = on_nylocas
+        self.nylocas_per_spawn = nylocas_per_spawn
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PlayerSpec":
+        return cls(**data)
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "loadout": self.loadout,
+            "on_boss_attack": self.on_boss_attack,
+            "swap_loadout": self.swap_loadout,
+            "thrall": self.thrall,
+            "damage_column": self.damage_column,
+            "on_nylocas": self.on_nylocas,
+            "nylocas_per_spawn": self.nylocas_per_spawn,
+        }
+
+class Scenario:
+    """A declarative fight setup: boss, scale, players, the loadouts they use and how many fights to run."""
+    def __init__(self, name: str, players: List[PlayerSpec], boss: str = "VerzikP2", scale: int = 2,
+                 loadouts: Optional[Dict[str, Dict]] = None, iterations: int = 1000, output: Optional[str] = None,
+                 seed: Optional[int] = None):
+        if boss not in BOSSES:
+            raise ValueError(f"Unknown boss {boss} for scenario {name}. Use one of: {', '.join(BOSSES)}.")
+        if boss != "Maiden" and any(spec.on_nylocas != "ignore" for spec in players):
+            raise ValueError(f"Scenario {name} has an on_nylocas policy, but only Maiden spawns Nylocas.")
+        self.name = name
+        self.boss = boss
+        self.scale = scale
+        self.players = players
+        self.iterations = iterations
+        self.output = output
+        self.seed = seed  # With a seed, fight i always replays the same way (see util.rng)
+
+        # Inline loadouts override default_loadouts entries of the same name
+        available = default_loadouts()
+        available.update(loadouts or {})
+        used = {spec.loadout for spec in players} | {spec.swap_loadout for spec in players if spec.swap_loadout}
+        missing = used - set(available)
+        if missing:
+            raise ValueError(f"Scenario {name} uses unknown loadouts: {', '.join(sorted(missing))}.")
+        self.loadouts = {loadout_name: available[loadout_name] for loadout_name in sorted(used)}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Scenario":
+        data = dict(data)
+        data["players"] = [PlayerSpec.from_dict(player) for player in data["players"]]
+        data["loadouts"] = {name: loadout_from_dict(loadout) for name, loadout in data.get("loadouts", {}).items()}
+        return cls(**data)
+
+    @classmethod
+    def from_file(cls, path: str) -> "Scenario":
+        """Loads a scenario from a JSON file."""
+        with open(path, 'r') as file:
+            return cls.from_dict(json.load(file))
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "boss": self.boss,
+            "scale": self.scale,
+            "players": [spec.to_dict() for spec in self.players],
+            "loadouts": {name: loadout_to_dict(loadout) for name, loadout in self.loadouts.items()},
+            "iterations": self.iterations,
+            "output": self.output,
+            "seed": self.seed,
+        }
+
+    @property
+    def loadouts_key(self) -> str:
+        """Content hash of the loadouts, used to reuse compiled loadouts across chunks and scenarios."""
+        canonical = json.dumps({name: loadout_to_dict(loadout) for name, loadout in self.loadouts.items()}, sort_keys=True)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    @property
+    def fight_key(self) -> str:
+        """Content hash of everything that decides how a fight goes, leaving out the name, output and iterations."""
+        fight = {key: value for key, value in self.to_dict().items() if key not in ("name", "output", "iterations")}
+        return hashlib.sha256(json.dumps(fight, sort_keys=True).encode()).hexdigest()
+
+    @property
+    def result_columns(self) -> List[str]:
+        return ['iter', 'ticks_until_defeat'] + [spec.damage_column for spec in self.players] + BOSSES[self.boss].RESULT_COLUMNS
+
+def loadout_from_dict(data: Dict) -> Dict:
+    """Turns a JSON loadout (stats given as a dict of levels) into a default_loadouts style entry."""
+    loadout = dict(data)
+    stats = loadout["stats"]
+    loadout["stats"] = PlayerStats(
+        attack=stats["attack"], strength=stats["strength"], defense=stats["defense"],
+        magic=stats["magic"], ranged=stats["ranged"], hp=stats.get("hp", 99)
+    )
+    return loadout
+
+def loadout_to_dict(loadout: Dict) -> Dict:
+    """Inverse of loadout_from_dict, keeping only the stat levels."""
+    data = dict(loadout)
+    data["stats"] = {key: getattr(loadout["stats"], field) for key, field in STAT_FIELDS.items()}
+    data["gear"] = list(loadout["gear"])
+    return data
+
+def load_scenarios(paths: List[str]) -> List[Scenario]:
+    """Loads every scenario file, expanding directories to the JSON files inside them."""
+    scenarios = []
+    for path in paths:
+        path = Path(path)
+        files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+        scenarios.extend(Scenario.from_file(str(file)) for file in files)
+    return scenarios
@@ -0,0 +1,64 @@
+import heapq
+from typing import List, Optional
+
+class FightScheduler:
+    """
+    Jumps a tick-based fight straight between the ticks where something happens.
+
+    Actors (players, bosses) provide:
+      ticks_until_next_event() -> ticks from now until the next tick they must be simulated in
+                                  (0 = the current tick), or None while they have nothing coming up
+      advance(ticks)           -> applies that many idle ticks at once, same state as calling tick() that often
+
+    The fight loop asks next_tick() for the next busy tick, simulates that tick in full exactly as a
+    plain tick loop would, then calls end_tick(). Ticks in between are idle for every actor, so
+    skipping them with advance() gives tick-for-tick identical fights.
+    """
+    def __init__(self, actors: List):
+        self.actors = list(actors)
+        self.tick = 0  # Ticks fully simulated or skipped so far
+        self.queue = []  # (tick, actor index, version)
+        self.versions = [0] * len(self.actors)
+        self.due: List[int] = []
+        for index in range(len(self.actors)):
+            self.schedule(index)
+
+    def schedule(self, index: int):
+        """(Re)computes an actor's next event. Call it when something outside its own events changes the actor."""
+        self.versions[index] += 1
+        delay = self.actors[index].ticks_until_next_event()
+        if delay is not None:
+            heapq.heappush(self.queue, (self.tick + delay, index, self.versions[index]))
+
+    def _pop_current(self) -> Optional[tuple]:
+        while self.queue:
+            entry = heapq.heappop(self.queue)
+            if entry[2] == self.versions[entry[1]]:
+                return entry
+        return None
+
+    def next_tick(self) -> Optional[int]:
+        """Advances every actor over the idle ticks up to the next busy tick and returns it, or None if nothing is left."""
+        entry = self._pop_current()
+        if entry is None:
+            return None
+        busy_tick = entry[0]
+        self.due = [entry[1]]
+        while self.queue and self.queue[0][0] == busy_tick:
+            tick, index, version = heapq.heappop(self.queue)
+            if version == self.versions[index]:
+                self.due.append(index)
+
+        idle = busy_tick - self.tick
+        if idle > 0:
+            for actor in self.actors:
+                actor.advance(idle)
+            self.tick = busy_tick
+        return busy_tick
+
+    def end_tick(self):
+        """Marks the busy tick as simulated and reschedules the actors whose event it was."""
+        self.tick += 1
+        for index in self.due:
+            self.schedule(index)
+        self.due = []
@@ -0,0 +1,113 @@
+import gzip
+import json
+from collections import deque
+from enum import IntEnum
+from typing import Iterable, List, NamedTuple, Optional
+
+class TraceLevel(IntEnum):
+    """How much a Tracer keeps. Each level includes everything below it."""
+    OFF = 0
+    PHASE = 1    # Phase procs, deaths, boss kills
+    ATTACK = 2   # Attacks and hits, swaps, delays, boss attacks
+    DETAIL = 3   # Thrall hits, special attack energy, damage taken and heals
+
+class TraceKind:
+    ATTACK = "attack"            # value: damage dealt (0 is a miss)
+    THRALL = "thrall"            # value: thrall damage
+    SWAP = "swap"                # detail: loadout swapped to
+    DELAY = "delay"              # Attack held for the boss's attack tick
+    BOSS_ATTACK = "boss_attack"  # detail: attack type, value: damage the boss took from it
+    PROC = "proc"                # value: boss hp left
+    BOSS_DEATH = "boss_death"
+    SPEC = "spec"                # value: energy left
+    SPEC_FAILED = "spec_failed"  # value: energy available
+    SPEC_REGEN = "spec_regen"    # value: energy after regenerating
+    DAMAGE_TAKEN = "damage_taken"  # value: damage, detail: hp left
+    VENGEANCE = "vengeance"      # value: damage reflected
+    DEATH = "death"
+    HEAL = "heal"                # value: amount, detail: hp after
+    SPAWN = "spawn"              # detail: what spawned and where
+
+class TraceEvent(NamedTuple):
+    tick: int
+    kind: str
+    source: str
+    value: float = 0
+    detail: str = ""
+
+# Level each kind is recorded at
+KIND_LEVELS = {
+    TraceKind.PROC: TraceLevel.PHASE,
+    TraceKind.BOSS_DEATH: TraceLevel.PHASE,
+    TraceKind.DEATH: TraceLevel.PHASE,
+    TraceKind.SPAWN: TraceLevel.PHASE,
+    TraceKind.ATTACK: TraceLevel.ATTACK,
+    TraceKind.SWAP: TraceLevel.ATTACK,
+    TraceKind.DELAY: TraceLevel.ATTACK,
+    TraceKind.BOSS_ATTACK: TraceLevel.ATTACK,
+    TraceKind.THRALL: TraceLevel.DETAIL,
+    TraceKind.SPEC: TraceLevel.DETAIL,
+    TraceKind.SPEC_FAILED: TraceLevel.DETAIL,
+    TraceKind.SPEC_REGEN: TraceLevel.DETAIL,
+    TraceKind.DAMAGE_TAKEN: TraceLevel.DETAIL,
+    TraceKind.VENGEANCE: TraceLevel.DETAIL,
+    TraceKind.HEAL: TraceLevel.DETAIL,
+}
+
+class Tracer:
+    """
+    Records typed fight events into a ring buffer that keeps the last capacity events.
+
+    Fight objects hold a tracer in their trace attribute, None by default, and every call site
+    is guarded with `if self.trace is not None`, so a run without a tracer pays one attribute
+    check per site and never builds an event.
+    """
+    def __init__(self, level: TraceLevel = TraceLevel.ATTACK, capacity: int = 100_000):
+        self.level = TraceLevel(level)
+        self.events = deque(maxlen=capacity)
+        self.tick = 0  # Set by the fight loop, stamped on every event
+
+    def record(self, kind: str, source: str, value: float = 0, detail: str = ""):
+        if KIND_LEVELS.get(kind, TraceLevel.DETAIL) <= self.level:
+            self.events.append(TraceEvent(self.tick, kind, source, value, detail))
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def lines(self) -> List[str]:
+        """Human readable form of the buffered events."""
+        return [format_event(event) for event in self.events]
+
+    def export(self, path: str):
+        """Writes the buffered events to path, one JSON array per line. Gzipped if path ends in .gz."""
+        write_trace(path, self.events)
+
+def format_event(event: TraceEvent) -> str:
+    text = f"[{event.tick:>5}] {event.source:<12} {event.kind}"
+    if event.value or event.kind in (TraceKind.ATTACK, TraceKind.THRALL):
+        text += f" {event.value:g}"
+    if event.detail:
+        text += f" ({event.detail})"
+    return text
+
+def _open(path: str, mode: str):
+    return gzip.open(path, mode + 't') if str(path).endswith('.gz') else open(path, mode)
+
+def write_trace(path: str, events: Iterable[TraceEvent]):
+    with _open(path, 'w') as file:
+        for event in events:
+            file.write(json.dumps(list(event), separators=(',', ':')) + '\n')
+
+def read_trace(path: str) -> List[TraceEvent]:
+    """Loads a trace written by Tracer.export."""
+    with _open(path, 'r') as file:
+        return [TraceEvent(*json.loads(line)) for line in file if line.strip()]
+
+def make_tracer(level: Optional[TraceLevel], capacity: int = 100_000) -> Optional[Tracer]:
+    """A tracer for level, or None (tracing off) for None or TraceLevel.OFF."""
+    if level is None or TraceLevel(level) == TraceLevel.OFF:
+        return None
+    return Tracer(level, capacity)
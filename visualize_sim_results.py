@@ -1,21 +1,21 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 from tabulate import tabulate
 import seaborn as sns
+from util.results import read_results, results_to_dataframe
 
 def plot_kill_time_distributions_and_stats(file_paths, labels=None):
     """
-    Plot kill time distributions from multiple CSV files and display statistics.
+    Plot kill time distributions from multiple results files and display statistics.
     
-    :param file_paths: List of file paths to the CSV files
+    :param file_paths: List of file paths to the results files
     :param labels: List of labels for the plots (Optional). Defaults to filenames.
     """
     plt.figure(figsize=(10, 6))
     stats_data = []
     
     for i, file_path in enumerate(file_paths):
-        # Read the CSV file
-        df = pd.read_csv(file_path)
+        # Read the results file (.csv, .npy or .parquet)
+        df = results_to_dataframe(read_results(file_path))
         
         # Use provided label or default to filename
         label = labels[i] if labels and i < len(labels) else file_path.split('/')[-1]
@@ -43,6 +43,6 @@ def plot_kill_time_distributions_and_stats(file_paths, labels=None):
     print(tabulate(stats_data, headers=['Dataset', 'Mean', 'Median'], tablefmt='grid'))
 
 # Example usage:
-file_paths = ['8_way_mage_no_boots_results.csv', '6_way_mage_no_boots_results.csv', 'duo_rancor_results.csv', 'duo_bf_results.csv']
+file_paths = ['8_way_mage_no_boots_results.npy', '6_way_mage_no_boots_results.npy', 'duo_rancor_results.npy', 'duo_bf_results.npy']
 labels = ['8 way mage', '6 way mage', 'Rancor', 'Blood fury']
 plot_kill_time_distributions_and_stats(file_paths, labels)